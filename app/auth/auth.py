@@ -1,24 +1,31 @@
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
+import jwt
 from app.config.config import SECRET_KEY, ALGORITHM
-from fastapi import HTTPException, status
-
-from typing import Union
+from fastapi import HTTPException, Request, status
 
 # Utility function to verify token and decode user data
-def verify_token(token: str):
+def verify_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if payload["exp"] < datetime.utcnow().timestamp():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return payload  
-    except JWTError:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+# Dependency returning the token payload verified by JWTAuthenticationMiddleware
+def get_current_user(request: Request) -> dict:
+    payload = getattr(request.state, "user", None)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
@@ -8,10 +8,75 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 DATABASE_NAME = os.getenv("DATABASE_NAME","school_db")
 
+# Connection pool sizing (per worker process)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "200"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# Connections opened during startup, before the worker reports ready
+MONGO_WARMUP_CONNECTIONS = int(os.getenv("MONGO_WARMUP_CONNECTIONS", str(MONGO_MIN_POOL_SIZE)))
+
+# Create missing indexes from app/database/indexes.py on startup
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "true").lower() == "true"
+
+# Nightly absentee job
+ABSENT_INSERT_CHUNK_SIZE = int(os.getenv("ABSENT_INSERT_CHUNK_SIZE", "1000"))
+
+# Grade/class reference cache
+REFERENCE_CACHE_TTL_SECONDS = int(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "1024"))
+# Invalidate across workers through a change stream (needs a replica set)
+REFERENCE_CACHE_CHANGE_STREAMS = os.getenv("REFERENCE_CACHE_CHANGE_STREAMS", "false").lower() == "true"
+
+# Bulk student import
+STUDENT_IMPORT_CHUNK_SIZE = int(os.getenv("STUDENT_IMPORT_CHUNK_SIZE", "500"))
+
+# Assignments written per bulk_write by the year-end promotion job
+PROMOTION_CHUNK_SIZE = int(os.getenv("PROMOTION_CHUNK_SIZE", "1000"))
+
+# Scans after this time (HH:MM:SS) count as late in the daily summaries
+LATE_AFTER = os.getenv("LATE_AFTER", "07:30:00")
+
+# Class roll sheets, cached per (class, day) until that class gets a new scan
+ROLL_SHEET_CACHE_TTL_SECONDS = int(os.getenv("ROLL_SHEET_CACHE_TTL_SECONDS", "300"))
+ROLL_SHEET_CACHE_MAX_ENTRIES = int(os.getenv("ROLL_SHEET_CACHE_MAX_ENTRIES", "512"))
+
+# Live attendance event stream
+EVENT_STREAM_QUEUE_SIZE = int(os.getenv("EVENT_STREAM_QUEUE_SIZE", "100"))
+EVENT_STREAM_KEEPALIVE_SECONDS = float(os.getenv("EVENT_STREAM_KEEPALIVE_SECONDS", "15"))
+
+# Scheduled jobs; each run is guarded by a lease in `job_locks` so only one
+# worker across all nodes executes it
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+ABSENT_JOB_HOUR = int(os.getenv("ABSENT_JOB_HOUR", "23"))
+ABSENT_JOB_MINUTE = int(os.getenv("ABSENT_JOB_MINUTE", "59"))
+ABSENT_CATCHUP_DAYS = int(os.getenv("ABSENT_CATCHUP_DAYS", "7"))
+JOB_LOCK_TTL_SECONDS = int(os.getenv("JOB_LOCK_TTL_SECONDS", "300"))
+
+# Requests issuing more MongoDB commands than this are logged and counted
+METRICS_MAX_QUERIES_PER_REQUEST = int(os.getenv("METRICS_MAX_QUERIES_PER_REQUEST", "20"))
+# Bearer token a scraper may use for /metrics instead of a JWT; unset disables it
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Readiness: how long a Mongo ping result is reused, and how long one may take
+HEALTH_PING_CACHE_SECONDS = float(os.getenv("HEALTH_PING_CACHE_SECONDS", "2"))
+HEALTH_PING_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PING_TIMEOUT_SECONDS", "1"))
+
 # JWT Configurations
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
+# QR signatures carry this version; bump it to revoke every issued code
+QR_SIGNATURE_VERSION = int(os.getenv("QR_SIGNATURE_VERSION", "1"))
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", "5"))
+LOGIN_MAX_CONCURRENT_PER_IP = int(os.getenv("LOGIN_MAX_CONCURRENT_PER_IP", "20"))
+LOGIN_MAX_CONCURRENT_PER_EMAIL = int(os.getenv("LOGIN_MAX_CONCURRENT_PER_EMAIL", "2"))
+
 # Sri lanakan timezone
-os.environ["TZ"] = os.getenv("TZ","Asia/Colombo")
\ No newline at end of file
+os.environ["TZ"] = os.getenv("TZ","Asia/Colombo")
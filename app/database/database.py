@@ -1,23 +1,139 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict
 from pymongo import MongoClient
 from pymongo.server_api import ServerApi
-from pymongo.errors import OperationFailure
-from app.config.config import MONGO_URI, DATABASE_NAME
-
-# Connect MongoDB
-try:
-    client = MongoClient(MONGO_URI, server_api=ServerApi('1'))
-    db = client[DATABASE_NAME]
-    db.command('ping')
-    print("✅ MongoDB Connection Successful!")
-except OperationFailure:
-    print("❌ MongoDB Connection Failed!")
+from pymongo.errors import PyMongoError
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.utils.metrics import mongo_command_listener, sync_pool_listener, async_pool_listener
+from app.config.config import (
+    MONGO_URI, DATABASE_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+    MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_WARMUP_CONNECTIONS
+)
+
+# Clients are created on first use and dropped by close_database(); the
+# lifespan calls connect_database() before the app starts serving
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+def get_client() -> MongoClient:
+    with _clients_lock:
+        if "sync" not in _clients:
+            _clients["sync"] = MongoClient(
+                MONGO_URI,
+                server_api=ServerApi('1'),
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=[mongo_command_listener, sync_pool_listener],
+                connect=False,
+            )
+        return _clients["sync"]
+
+# Async (Motor) client used by the async services, so requests don't hold a
+# threadpool worker for the whole database round-trip
+def get_async_client() -> AsyncIOMotorClient:
+    with _clients_lock:
+        if "async" not in _clients:
+            _clients["async"] = AsyncIOMotorClient(
+                MONGO_URI,
+                server_api=ServerApi('1'),
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=[mongo_command_listener, async_pool_listener],
+            )
+        return _clients["async"]
+
+
+class LazyHandle:
+    """
+    Module-level stand-in for a database or collection. It resolves against
+    the current client on each use, so importing this module opens nothing
+    and a client replaced after close_database() is picked up.
+    """
+
+    __slots__ = ("name", "_get_client", "_path", "_client", "_target")
+
+    def __init__(self, get_client: Callable[[], Any], *path: str):
+        self.name = path[-1]
+        self._get_client = get_client
+        self._path = path
+        self._client = None
+        self._target = None
+
+    def _resolve(self):
+        client = self._get_client()
+        if client is not self._client:
+            target = client
+            for key in self._path:
+                target = target[key]
+            self._client, self._target = client, target
+        return self._target
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._resolve(), attribute)
+
+    def __getitem__(self, key: str):
+        return self._resolve()[key]
+
+    def __repr__(self) -> str:
+        return f"LazyHandle({'.'.join(self._path)!r})"
+
+
+db = LazyHandle(get_client, DATABASE_NAME)
 
 # Collections
-admins = db["admins"]
-students = db["students"]
-grades = db["grades"]
-classes = db["classes"]
-student_class_assignments = db["student_class_assignments"]
-attendance = db["attendance "]
-
-""" students.create_index("index_number", unique=True) """
+admins = LazyHandle(get_client, DATABASE_NAME, "admins")
+students = LazyHandle(get_client, DATABASE_NAME, "students")
+grades = LazyHandle(get_client, DATABASE_NAME, "grades")
+classes = LazyHandle(get_client, DATABASE_NAME, "classes")
+student_class_assignments = LazyHandle(get_client, DATABASE_NAME, "student_class_assignments")
+attendance = LazyHandle(get_client, DATABASE_NAME, "attendance ")
+attendance_daily_summaries = LazyHandle(get_client, DATABASE_NAME, "attendance_daily_summaries")
+job_locks = LazyHandle(get_client, DATABASE_NAME, "job_locks")
+job_runs = LazyHandle(get_client, DATABASE_NAME, "job_runs")
+
+async_db = LazyHandle(get_async_client, DATABASE_NAME)
+
+# Async Collections
+async_admins = LazyHandle(get_async_client, DATABASE_NAME, "admins")
+async_students = LazyHandle(get_async_client, DATABASE_NAME, "students")
+async_grades = LazyHandle(get_async_client, DATABASE_NAME, "grades")
+async_classes = LazyHandle(get_async_client, DATABASE_NAME, "classes")
+async_student_class_assignments = LazyHandle(get_async_client, DATABASE_NAME, "student_class_assignments")
+async_attendance = LazyHandle(get_async_client, DATABASE_NAME, "attendance ")
+async_attendance_daily_summaries = LazyHandle(get_async_client, DATABASE_NAME, "attendance_daily_summaries")
+async_job_locks = LazyHandle(get_async_client, DATABASE_NAME, "job_locks")
+async_job_runs = LazyHandle(get_async_client, DATABASE_NAME, "job_runs")
+
+# Round-trip to the server through the async client, False when unreachable
+async def ping() -> bool:
+    try:
+        await get_async_client().admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+async def connect_database() -> bool:
+    """
+    Check the server is reachable and open MONGO_WARMUP_CONNECTIONS pooled
+    connections up front, so the first requests don't pay for the handshakes.
+    """
+    async_client = get_async_client()
+    try:
+        await asyncio.gather(*(async_client.admin.command("ping") for _ in range(max(1, MONGO_WARMUP_CONNECTIONS))))
+        await asyncio.to_thread(get_client().admin.command, "ping")
+        print("✅ MongoDB Connection Successful!")
+        return True
+    except PyMongoError as e:
+        print(f"❌ MongoDB Connection Failed! {e}")
+        return False
+
+def close_database():
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
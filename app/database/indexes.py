@@ -0,0 +1,152 @@
+"""
+Declarative index registry for every collection.
+
+Run `python -m app.database.indexes` to create missing indexes, or
+`python -m app.database.indexes --check` to only report drift.
+"""
+import sys
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+from app.database.database import db, attendance, attendance_daily_summaries, job_runs
+
+# Soft-deleted documents are left out of the unique indexes, so an email or
+# index number can be reused once the old record is deleted
+ACTIVE_ONLY = {"deleted_at": None}
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    attendance.name: [
+        IndexModel([("student_id", ASCENDING), ("scan_date", ASCENDING)], unique=True, name="student_id_scan_date_unique"),
+        IndexModel([("scan_date", ASCENDING), ("class_id", ASCENDING)], name="scan_date_class_id"),
+        IndexModel([("scan_date", ASCENDING), ("grade_id", ASCENDING)], name="scan_date_grade_id"),
+    ],
+    attendance_daily_summaries.name: [
+        IndexModel([("scan_date", ASCENDING), ("grade_id", ASCENDING), ("class_id", ASCENDING)], unique=True, name="scan_date_grade_id_class_id_unique"),
+    ],
+    "students": [
+        IndexModel([("index_number", ASCENDING)], unique=True, partialFilterExpression=ACTIVE_ONLY, name="index_number_unique_active"),
+        IndexModel([("status", ASCENDING), ("deleted_at", ASCENDING)], name="status_deleted_at"),
+    ],
+    "student_class_assignments": [
+        # One live assignment per student and year, also guards promotion against concurrent assigns
+        IndexModel([("student_id", ASCENDING), ("academic_year", ASCENDING)], unique=True, partialFilterExpression=ACTIVE_ONLY, name="student_id_academic_year_unique_active"),
+        IndexModel([("student_id", ASCENDING), ("academic_year", DESCENDING)], name="student_id_academic_year"),
+        IndexModel([("academic_year", ASCENDING), ("grade_id", ASCENDING), ("class_id", ASCENDING)], name="academic_year_grade_id_class_id"),
+        IndexModel([("class_id", ASCENDING), ("academic_year", ASCENDING)], name="class_id_academic_year"),
+    ],
+    "classes": [
+        IndexModel([("grade_id", ASCENDING), ("section_name", ASCENDING)], unique=True, partialFilterExpression=ACTIVE_ONLY, name="grade_id_section_name_unique_active"),
+    ],
+    "grades": [
+        IndexModel([("grade_level", ASCENDING)], partialFilterExpression=ACTIVE_ONLY, name="grade_level_active"),
+    ],
+    job_runs.name: [
+        IndexModel([("job", ASCENDING), ("scan_date", ASCENDING), ("status", ASCENDING)], name="job_scan_date_status"),
+        IndexModel([("job", ASCENDING), ("started_at", DESCENDING)], name="job_started_at"),
+    ],
+    "admins": [
+        IndexModel([("email", ASCENDING)], unique=True, partialFilterExpression=ACTIVE_ONLY, name="email_unique_active"),
+    ],
+}
+
+# Options that make two indexes with the same name different
+COMPARED_OPTIONS = ("unique", "partialFilterExpression", "sparse", "expireAfterSeconds")
+
+
+def _normalize(spec: dict) -> dict:
+    key = spec["key"]
+    fields = key.items() if hasattr(key, "items") else key
+    normalized = {"key": [(field, int(direction)) for field, direction in fields]}
+    for option in COMPARED_OPTIONS:
+        if spec.get(option):
+            normalized[option] = spec[option]
+    return normalized
+
+
+def check_indexes(database: Database = db) -> Dict[str, dict]:
+    """
+    Compare the registry with the indexes on the server.
+    Returns per collection the `missing`, `changed` and `extra` index names.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        existing = database[collection_name].index_information()
+        existing.pop("_id_", None)
+
+        missing, changed = [], []
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            if name not in existing:
+                missing.append(name)
+            elif _normalize(spec) != _normalize(existing[name]):
+                changed.append(name)
+
+        wanted = {model.document["name"] for model in models}
+        extra = sorted(name for name in existing if name not in wanted)
+        report[collection_name] = {"missing": missing, "changed": changed, "extra": extra}
+
+    return report
+
+
+def ensure_indexes(database: Database = db, rebuild_changed: bool = False) -> Dict[str, dict]:
+    """
+    Create missing indexes. Indexes whose definition drifted are only
+    dropped and recreated when `rebuild_changed` is set.
+    Returns per collection the `created` names, remaining `changed` and
+    `extra` drift, and `errors` for indexes that failed to build.
+    """
+    drift_report = check_indexes(database)
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        drift = drift_report[collection_name]
+
+        to_create = set(drift["missing"])
+        if rebuild_changed:
+            to_create.update(drift["changed"])
+
+        created, errors = [], {}
+        for model in models:
+            name = model.document["name"]
+            if name not in to_create:
+                continue
+            try:
+                if name in drift["changed"]:
+                    collection.drop_index(name)
+                collection.create_indexes([model])
+                created.append(name)
+            except PyMongoError as e:
+                errors[name] = str(e)
+
+        report[collection_name] = {
+            "created": created,
+            "changed": [name for name in drift["changed"] if name not in created],
+            "extra": drift["extra"],
+            "errors": errors,
+        }
+
+    return report
+
+
+def print_report(report: Dict[str, dict]):
+    for collection_name, drift in report.items():
+        name = collection_name.strip()
+        if drift.get("created"):
+            print(f"✅ {name}: created {drift['created']}")
+        problems = {key: value for key, value in drift.items() if value and key != "created"}
+        for key, value in problems.items():
+            print(f"❌ {name}: {key} {value}")
+        if not problems and not drift.get("created"):
+            print(f"✅ {name}: indexes up to date")
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv:
+        drift_report = check_indexes()
+        print_report(drift_report)
+        has_drift = any(drift["missing"] or drift["changed"] for drift in drift_report.values())
+        sys.exit(1 if has_drift else 0)
+
+    print_report(ensure_indexes(rebuild_changed="--rebuild-changed" in sys.argv))
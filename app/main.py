@@ -1,11 +1,48 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from pymongo.errors import PyMongoError
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware.auth_middleware import JWTAuthenticationMiddleware
-from app.routes import admin_routes, auth_routes, student_routes, grade_routes, class_routes, student_assign_class_routes, attendance_routes
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.routes import admin_routes, auth_routes, student_routes, grade_routes, class_routes, student_assign_class_routes, attendance_routes, system_routes, analytics_routes, attendance_stream_routes
 from datetime import datetime
 from app.utils.security import sri_lankan_now
+from app.config.config import ENSURE_INDEXES_ON_STARTUP, REFERENCE_CACHE_CHANGE_STREAMS, SCHEDULER_ENABLED
+from app.database.database import connect_database, close_database
+from app.database.indexes import ensure_indexes, print_report
+from app.utils.reference_cache import reference_cache
+from app.sheduler.mark_absent_sheduler import start_scheduler, shutdown_scheduler
+from app.services.health_services import loop_lag_monitor
 
-app = FastAPI(title="School Management API", version="1.0", description="API for managing school attendance, bell systems, and other school-related operations.")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connected = await connect_database()
+
+    if ENSURE_INDEXES_ON_STARTUP and connected:
+        print_report(await asyncio.to_thread(ensure_indexes))
+
+    if connected:
+        try:
+            await reference_cache.warm()
+        except PyMongoError as e:
+            print(f"❌ Reference cache warm-up failed: {e}")
+
+    cache_watcher = asyncio.create_task(reference_cache.watch_changes()) if REFERENCE_CACHE_CHANGE_STREAMS else None
+    lag_monitor = asyncio.create_task(loop_lag_monitor.run())
+
+    if SCHEDULER_ENABLED:
+        start_scheduler()
+
+    yield
+
+    shutdown_scheduler()
+    lag_monitor.cancel()
+    if cache_watcher:
+        cache_watcher.cancel()
+    close_database()
+
+app = FastAPI(title="School Management API", version="1.0", description="API for managing school attendance, bell systems, and other school-related operations.", lifespan=lifespan)
 
 # Add JWT authentication middleware
 app.add_middleware(JWTAuthenticationMiddleware)
@@ -26,6 +63,8 @@ app.add_middleware(
 
     ) 
 
+# Outermost, so latency includes authentication and CORS handling
+app.add_middleware(MetricsMiddleware)
 
 # add time zone
 datetime.utcnow() == sri_lankan_now()
@@ -51,6 +90,15 @@ app.include_router(grade_routes.router)
 # Include Class Routes
 app.include_router(class_routes.router)
 
+# Include Live Attendance Stream Routes
+app.include_router(attendance_stream_routes.router)
+
+# Include Analytics Routes
+app.include_router(analytics_routes.router)
+
+# Include System Routes
+app.include_router(system_routes.router)
+
 
     
 # Root Endpoint (Optional)
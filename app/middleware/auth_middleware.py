@@ -1,36 +1,124 @@
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+import hmac
+import time
+from urllib.parse import parse_qs
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.auth.auth import verify_token
+from app.config.config import METRICS_TOKEN
 
-from fastapi import HTTPException, Request, status
-from starlette.middleware.base import BaseHTTPMiddleware
+# Routes reachable without a token
+PUBLIC_PATHS = {"/docs", "/openapi.json", "/login", "/", "/healthz", "/readyz"}
 
-class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+# Also reachable with METRICS_TOKEN as the bearer token, when it is set
+METRICS_PATH = "/metrics"
+
+# Browsers cannot set headers on WebSocket/EventSource, so these routes
+# also accept the token as a `token` query parameter
+QUERY_TOKEN_PATHS = {"/ws/attendance", "/attendance/stream"}
+
+# Verified tokens kept in memory, each until its own `exp`
+TOKEN_CACHE_SIZE = 4096
+
+
+class TokenCache:
+    """
+    LRU of verified token payloads keyed by the raw token string. Only
+    touched from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return entry[1]
+
+    def set(self, token: str, payload: dict):
+        expires_at = payload.get("exp")
+        if expires_at is None:
+            return
+        self._entries[token] = (float(expires_at), payload)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class JWTAuthenticationMiddleware:
+    """
+    Pure ASGI middleware: checks the bearer token without wrapping the
+    response, and puts the verified payload on `request.state.user`.
+    """
+
+    def __init__(self, app: ASGIApp, cache_size: int = TOKEN_CACHE_SIZE):
+        self.app = app
+        self.token_cache = TokenCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip authentication for docs and login routes
-        if request.url.path in ["/docs", "/openapi.json", "/login","/"]:
-            return await call_next(request)
-        
+        if scope["type"] not in ("http", "websocket") or scope["path"] in PUBLIC_PATHS:
+            return await self.app(scope, receive, send)
+
+        if scope["path"] == METRICS_PATH and self.has_metrics_token(scope):
+            return await self.app(scope, receive, send)
+
+        try:
+            payload = self.authenticate(scope)
+        except HTTPException as e:
+            if scope["type"] == "websocket":
+                # Closing before accept rejects the handshake
+                return await send({"type": "websocket.close", "code": 1008, "reason": str(e.detail)})
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            return await response(scope, receive, send)
+
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
+
+    def has_metrics_token(self, scope: Scope) -> bool:
+        if not METRICS_TOKEN:
+            return False
+        expected = f"Bearer {METRICS_TOKEN}".encode()
+        return any(name == b"authorization" and hmac.compare_digest(value, expected) for name, value in scope["headers"])
+
+    def authenticate(self, scope: Scope) -> dict:
         # Get the Authorization header
-        authorization: str = request.headers.get("Authorization")
-        
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+
+        if not authorization and scope["path"] in QUERY_TOKEN_PATHS:
+            query_token = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("token")
+            if query_token:
+                authorization = f"Bearer {query_token[0]}"
+
         if not authorization:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authorization token is missing",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
-        # Process token here (assuming verify_token function is defined)
-        token = authorization.split(" ")[1]
-        payload = verify_token(token)
-        
-        if not payload:
+
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Continue with the request if token is valid
-        return await call_next(request)
+        payload = self.token_cache.get(token)
+        if payload is None:
+            payload = verify_token(token)
+            self.token_cache.set(token, payload)
+        return payload
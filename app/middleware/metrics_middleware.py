@@ -0,0 +1,45 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.metrics import RequestStats, current_request_stats, metrics
+from app.config.config import METRICS_MAX_QUERIES_PER_REQUEST
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request and counting the Mongo
+    commands it issues, labelled by route template rather than raw path.
+    """
+
+    def __init__(self, app: ASGIApp, max_queries: int = METRICS_MAX_QUERIES_PER_REQUEST):
+        self.app = app
+        self.max_queries = max_queries
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+        metrics.in_flight += 1
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            current_request_stats.reset(token)
+            duration = time.perf_counter() - started
+            # The router stores the matched route on the shared scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            over_limit = stats.commands > self.max_queries
+            if over_limit:
+                print(f"❌ {scope['method']} {route_path} issued {stats.commands} MongoDB commands (limit {self.max_queries})")
+            metrics.observe_request(scope["method"], route_path, status_code, duration, stats, over_limit)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import TypeVar, Generic, Optional
+from typing import TypeVar, Generic, Optional, List
 
 # Define a type variable that can be used for any data type
 T = TypeVar('T')
@@ -7,4 +7,18 @@ T = TypeVar('T')
 class ApiResponse(BaseModel, Generic[T]):
     status: bool
     message: str
-    data: Optional[T]
\ No newline at end of file
+    data: Optional[T]
+
+# Page of results for list endpoints
+class PaginatedData(BaseModel, Generic[T]):
+    items: List[T]
+    total: int
+    page: int
+    limit: int
+
+
+# Keyset-paginated page, pass `next_cursor` back as `cursor` for the next page
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    limit: int
+    next_cursor: Optional[str] = None
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict, List, Optional, Union
 from app.schemas.admin_shema import AdminCreateSchema, AdminResponseSchema, AdminUpdateSchema
 from app.services.admin_service import create_admin, get_all_admins, get_admin_by_id, update_admin, soft_delete_admin
-from app.models.api_response import ApiResponse
+from app.models.api_response import ApiResponse, CursorPage
+from app.utils.responses import api_response
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, parse_fields
 
 router = APIRouter()
 
 # Create Admin
 @router.post("/admin", response_model=ApiResponse[AdminResponseSchema], status_code=201)
-def create_new_admin(admin: AdminCreateSchema):
-    created_admin = create_admin(admin)
+async def create_new_admin(admin: AdminCreateSchema):
+    created_admin = await create_admin(admin)
     return ApiResponse[AdminResponseSchema](
         status=True,
         message="Admin created successfully",
@@ -17,19 +19,19 @@ def create_new_admin(admin: AdminCreateSchema):
     )
 
 # Get All Admins
-@router.get("/admin", response_model=ApiResponse[List[AdminResponseSchema]])
-def get_all_admin():
-    admins = get_all_admins()
-    return ApiResponse[List[AdminResponseSchema]](
-        status=True,
-        message="Admins retrieved successfully",
-        data=admins
-    )
+@router.get("/admin", response_model=ApiResponse[CursorPage[Union[AdminResponseSchema, Dict[str, Any]]]])
+async def get_all_admin(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    admins = await get_all_admins(cursor, limit, parse_fields(fields, AdminResponseSchema))
+    return api_response(admins, "Admins retrieved successfully")
 
 # Get Admin By ID
 @router.get("/admin/{admin_id}", response_model=ApiResponse[AdminResponseSchema])
-def get_admin(admin_id: str):
-    admin_data = get_admin_by_id(admin_id)
+async def get_admin(admin_id: str):
+    admin_data = await get_admin_by_id(admin_id)
     if admin_data is None:
         raise HTTPException(status_code=404, detail="Admin not found")
     return ApiResponse[AdminResponseSchema](
@@ -41,7 +43,7 @@ def get_admin(admin_id: str):
 # Update Admin
 @router.put("/admin/{admin_id}", response_model=ApiResponse[AdminResponseSchema])
 async def update_admin_data(admin_id: str, admin: AdminUpdateSchema):
-    data = update_admin(admin_id, admin)
+    data = await update_admin(admin_id, admin)
     if data is None:
         raise HTTPException(status_code=404, detail="Admin not found")
     return ApiResponse[AdminResponseSchema](
@@ -53,7 +55,7 @@ async def update_admin_data(admin_id: str, admin: AdminUpdateSchema):
 # Soft Delete Admin
 @router.delete("/admin/{admin_id}", response_model=ApiResponse[None])
 async def delete_admin(admin_id: str):
-    success = soft_delete_admin(admin_id)
+    success = await soft_delete_admin(admin_id)
     if not success:
         raise HTTPException(status_code=404, detail="Admin not found or already deleted")
     return ApiResponse[None](
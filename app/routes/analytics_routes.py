@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+from datetime import date
+from app.schemas.analytics_schema import AttendanceAnalyticsSchema, StudentAttendanceStatsSchema
+from app.services.analytics_services import get_attendance_analytics
+from app.models.api_response import ApiResponse
+
+router = APIRouter()
+
+# Attendance rates and absence streaks per student and class for a date range
+@router.get("/analytics/attendance", response_model=ApiResponse[AttendanceAnalyticsSchema])
+async def get_attendance_analytics_route(
+    start_date: date,
+    end_date: date,
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    threshold: float = Query(0.9, gt=0, le=1, description="Attendance rate below which a student is chronically absent")
+):
+    analytics = await get_attendance_analytics(start_date, end_date, threshold, grade_id, class_id)
+    return ApiResponse[AttendanceAnalyticsSchema](
+        status=True,
+        message="Attendance analytics retrieved successfully",
+        data=analytics
+    )
+
+# Students below the attendance threshold, lowest rate first
+@router.get("/analytics/attendance/chronic-absence", response_model=ApiResponse[List[StudentAttendanceStatsSchema]])
+async def get_chronic_absence_route(
+    start_date: date,
+    end_date: date,
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    threshold: float = Query(0.9, gt=0, le=1, description="Attendance rate below which a student is chronically absent")
+):
+    analytics = await get_attendance_analytics(start_date, end_date, threshold, grade_id, class_id)
+    chronic = sorted(
+        (student for student in analytics.students if student.attendance_rate < threshold),
+        key=lambda student: student.attendance_rate
+    )
+    return ApiResponse[List[StudentAttendanceStatsSchema]](
+        status=True,
+        message="Chronically absent students retrieved successfully",
+        data=chronic
+    )
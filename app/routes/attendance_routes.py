@@ -1,17 +1,25 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.schemas.attendance_schema import AttendanceCreateSchema, AttendanceResponseSchema
-from app.services.attendance_services import mark_attendance, mark_absent_students, get_attendance_by_student
-from app.models.api_response import ApiResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
+from app.schemas.attendance_schema import AttendanceCreateSchema, AttendanceResponseSchema, QrSignatureResponseSchema, AttendanceBatchSchema, AttendanceBatchResultSchema, AttendanceDailySummarySchema, AttendanceGradeSummarySchema, AttendanceRollSheetSchema
+from app.services.attendance_services import mark_attendance, mark_attendance_fast, mark_attendance_batch, create_qr_signature, get_attendance_by_student
+from app.services.attendance_roll_services import get_class_roll_sheet
+from app.services.attendance_summary_services import get_daily_summaries, get_grade_summaries, rebuild_daily_summaries
+from app.sheduler.mark_absent_sheduler import run_mark_absent_for_day
+from app.services.attendance_export_services import build_export_query, stream_attendance_ndjson, stream_attendance_csv
+from app.models.api_response import ApiResponse, CursorPage
+from app.utils.responses import api_response
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, parse_fields
 from pymongo.errors import PyMongoError
-from typing import List
+from typing import Any, Dict, List, Optional, Union
+from datetime import date
 
 router = APIRouter()
 
 # Mark attendance via QR scan
 @router.post("/attendance", response_model=ApiResponse[AttendanceResponseSchema], status_code=201)
-def mark_attendance_route(attendance_data: AttendanceCreateSchema):
+async def mark_attendance_route(attendance_data: AttendanceCreateSchema):
     try:
-        attendance_record = mark_attendance(attendance_data)
+        attendance_record = await mark_attendance(attendance_data)
         return ApiResponse[AttendanceResponseSchema](
             status=True,
             message="Attendance marked successfully",
@@ -22,11 +30,49 @@ def mark_attendance_route(attendance_data: AttendanceCreateSchema):
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
+# Mark attendance via QR scan (fast path, one DB write per scan)
+@router.post("/attendance/scan", response_model=ApiResponse[AttendanceResponseSchema], status_code=201)
+async def mark_attendance_fast_route(attendance_data: AttendanceCreateSchema):
+    try:
+        attendance_record = await mark_attendance_fast(attendance_data)
+        return ApiResponse[AttendanceResponseSchema](
+            status=True,
+            message="Attendance marked successfully",
+            data=attendance_record
+        )
+    except HTTPException as e:
+        raise e
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Replay buffered scans from an offline gate device
+@router.post("/attendance/batch", response_model=ApiResponse[AttendanceBatchResultSchema])
+async def mark_attendance_batch_route(batch: AttendanceBatchSchema):
+    try:
+        result = await mark_attendance_batch(batch.scans)
+        return ApiResponse[AttendanceBatchResultSchema](
+            status=True,
+            message=f"{result.created} scans recorded, {result.duplicates} duplicates, {result.invalid} invalid",
+            data=result
+        )
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Signed QR payload for a student
+@router.get("/attendance/qr-signature", response_model=ApiResponse[QrSignatureResponseSchema])
+async def create_qr_signature_route(student_id: str, grade_id: str, class_id: str):
+    signature = await create_qr_signature(student_id, grade_id, class_id)
+    return ApiResponse[QrSignatureResponseSchema](
+        status=True,
+        message="QR signature created successfully",
+        data=signature
+    )
+    
 # Background task to mark absent students
 @router.post("/attendance/mark-absent", response_model=ApiResponse[None])
-def mark_absent_students_route(background_tasks: BackgroundTasks):
+def mark_absent_students_route(background_tasks: BackgroundTasks, scan_date: Optional[date] = None):
     try:
-        background_tasks.add_task(mark_absent_students)
+        background_tasks.add_task(run_mark_absent_for_day, scan_date)
         return ApiResponse[None](
             status=True,
             message="Background task to mark absentees started",
@@ -36,11 +82,68 @@ def mark_absent_students_route(background_tasks: BackgroundTasks):
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
 # Get attendance records for a student
-@router.get("/attendance/student/{student_id}", response_model=ApiResponse[List[AttendanceResponseSchema]])
-def get_attendance_by_student_route(student_id: str):
-    attendance_records = get_attendance_by_student(student_id)
-    return ApiResponse[List[AttendanceResponseSchema]](
+@router.get("/attendance/student/{student_id}", response_model=ApiResponse[CursorPage[Union[AttendanceResponseSchema, Dict[str, Any]]]])
+async def get_attendance_by_student_route(
+    student_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    attendance_records = await get_attendance_by_student(student_id, cursor, limit, parse_fields(fields, AttendanceResponseSchema))
+    return api_response(attendance_records, "Attendance records retrieved successfully")
+    
+# Stream attendance records for a date range as NDJSON or CSV
+@router.get("/attendance/export")
+async def export_attendance_route(
+    start_date: date,
+    end_date: date,
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$")
+):
+    query = build_export_query(start_date, end_date, grade_id, class_id)
+    filename = f"attendance_{start_date}_{end_date}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format == "csv":
+        return StreamingResponse(stream_attendance_csv(query), media_type="text/csv", headers=headers)
+    return StreamingResponse(stream_attendance_ndjson(query), media_type="application/x-ndjson", headers=headers)
+
+# Who is present/absent in a class on a day, one aggregation, cached until the next scan
+@router.get("/attendance/class/{class_id}/roll", response_model=ApiResponse[AttendanceRollSheetSchema])
+async def get_class_roll_sheet_route(class_id: str, scan_date: date = Query(default_factory=date.today), academic_year: Optional[int] = None):
+    roll_sheet = await get_class_roll_sheet(class_id, scan_date, academic_year)
+    return api_response(roll_sheet, "Roll sheet retrieved successfully")
+
+# Present/absent/late counts per class for a day
+@router.get("/attendance/summary", response_model=ApiResponse[List[AttendanceDailySummarySchema]])
+async def get_daily_summaries_route(scan_date: date, grade_id: Optional[str] = None, class_id: Optional[str] = None):
+    summaries = await get_daily_summaries(scan_date, grade_id, class_id)
+    return ApiResponse[List[AttendanceDailySummarySchema]](
         status=True,
-        message="Attendance records retrieved successfully",
-        data=attendance_records
-    )
\ No newline at end of file
+        message="Attendance summary retrieved successfully",
+        data=summaries
+    )
+
+# Present/absent/late counts per grade for a day
+@router.get("/attendance/summary/grades", response_model=ApiResponse[List[AttendanceGradeSummarySchema]])
+async def get_grade_summaries_route(scan_date: date):
+    summaries = await get_grade_summaries(scan_date)
+    return ApiResponse[List[AttendanceGradeSummarySchema]](
+        status=True,
+        message="Attendance summary retrieved successfully",
+        data=summaries
+    )
+
+# Recompute a day's summaries from the attendance records
+@router.post("/attendance/summary/rebuild", response_model=ApiResponse[dict])
+async def rebuild_daily_summaries_route(scan_date: date):
+    try:
+        rebuilt = await rebuild_daily_summaries(scan_date)
+        return ApiResponse[dict](
+            status=True,
+            message="Attendance summary rebuilt successfully",
+            data={"scan_date": str(scan_date), "classes": rebuilt}
+        )
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
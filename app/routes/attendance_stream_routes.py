@@ -0,0 +1,69 @@
+import asyncio
+import orjson
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.services.attendance_stream_services import attendance_event_hub, Subscriber
+from app.config.config import EVENT_STREAM_KEEPALIVE_SECONDS
+
+router = APIRouter()
+
+# Subscribes only once the body is streamed, so a response that is never
+# sent can't leave a subscriber behind
+async def _sse_events(grade_id: Optional[str], class_id: Optional[str]):
+    subscriber = attendance_event_hub.subscribe(grade_id, class_id)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=EVENT_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            yield b"event: scan\ndata: " + orjson.dumps(event) + b"\n\n"
+    finally:
+        attendance_event_hub.unsubscribe(subscriber)
+
+# Live scan events as Server-Sent Events, optionally for one grade or class
+@router.get("/attendance/stream")
+async def attendance_stream_route(grade_id: Optional[str] = None, class_id: Optional[str] = None):
+    return StreamingResponse(
+        _sse_events(grade_id, class_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _send_events(websocket: WebSocket, subscriber: Subscriber):
+    while True:
+        event = await subscriber.queue.get()
+        if event is None:
+            # Fell too far behind; the client should reconnect and resync
+            await websocket.close(code=1013)
+            return
+        await websocket.send_text(orjson.dumps(event).decode())
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+# Live scan events over a WebSocket, optionally for one grade or class
+@router.websocket("/ws/attendance")
+async def attendance_websocket_route(websocket: WebSocket, grade_id: Optional[str] = None, class_id: Optional[str] = None):
+    await websocket.accept()
+    subscriber = attendance_event_hub.subscribe(grade_id, class_id)
+    tasks = []
+    try:
+        tasks.append(asyncio.create_task(_send_events(websocket, subscriber)))
+        tasks.append(asyncio.create_task(_wait_for_disconnect(websocket)))
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        attendance_event_hub.unsubscribe(subscriber)
+        for task in tasks:
+            task.cancel()
+        # Retrieve every outcome, a send to a vanished client is expected here
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.services.auth_services import authenticate_admin, logout
 from app.schemas.auth_schema import LoginSchema, TokenResponseSchema
 from app.models.api_response import ApiResponse
@@ -6,8 +6,9 @@ from app.models.api_response import ApiResponse
 router = APIRouter()
 
 @router.post("/login",response_model=ApiResponse[TokenResponseSchema])
-def login(login_data: LoginSchema):
-    token_data = authenticate_admin(login_data)
+async def login(login_data: LoginSchema, request: Request):
+    client_ip = request.client.host if request.client else "unknown"
+    token_data = await authenticate_admin(login_data, client_ip)
     
     if token_data is None:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -1,8 +1,10 @@
-from fastapi import HTTPException, APIRouter
+from fastapi import HTTPException, APIRouter, Query
 from app.services.class_services import create_class, get_all_classes, get_class_by_id, update_class, soft_delete_class, get_classes_by_grade
 from app.schemas.class_schema import ClassResponseSchema, classCreateSchema, ClassUpdateSchema
-from typing import List
-from app.models.api_response import ApiResponse
+from typing import Any, Dict, List, Optional, Union
+from app.models.api_response import ApiResponse, CursorPage
+from app.utils.responses import api_response
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, parse_fields
 
 router = APIRouter()
 
@@ -17,14 +19,14 @@ def create_class_route(cls: classCreateSchema):
     )
     
 # Get All Classes
-@router.get("/classes", response_model=ApiResponse[List[ClassResponseSchema]])
-def get_all_classes_route():
-    classes = get_all_classes()
-    return ApiResponse[List[ClassResponseSchema]](
-        status=True,
-        message="Classes retrieved successfully",
-        data=classes
-    )
+@router.get("/classes", response_model=ApiResponse[CursorPage[Union[ClassResponseSchema, Dict[str, Any]]]])
+def get_all_classes_route(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    classes = get_all_classes(cursor, limit, parse_fields(fields, ClassResponseSchema))
+    return api_response(classes, "Classes retrieved successfully")
 
 # Get Class by ID
 @router.get("/classes/{class_id}", response_model=ApiResponse[ClassResponseSchema])
@@ -39,15 +41,16 @@ def get_class_by_id_route(class_id: str):
     )
 
 # get class by grade
-@router.get("/grades/{grade_id}/classes", response_model=ApiResponse[List[ClassResponseSchema]])
-def get_classes_by_grade_route(grade_id: str):
+@router.get("/grades/{grade_id}/classes", response_model=ApiResponse[CursorPage[Union[ClassResponseSchema, Dict[str, Any]]]])
+def get_classes_by_grade_route(
+    grade_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
    
-    classes = get_classes_by_grade(grade_id)
-    return ApiResponse[List[ClassResponseSchema]](
-        status=True,
-        message="Classes retrieved successfully.",
-        data=classes
-    )
+    classes = get_classes_by_grade(grade_id, cursor, limit, parse_fields(fields, ClassResponseSchema))
+    return api_response(classes, "Classes retrieved successfully.")
     
 # Update Class
 @router.put("/classes/{class_id}", response_model=ApiResponse[ClassResponseSchema])
@@ -1,8 +1,10 @@
-from fastapi import HTTPException,APIRouter
+from fastapi import HTTPException,APIRouter, Query
 from app.services.grade_services import create_grade, update_grade, get_all_grade, get_grade_by_id, soft_delete_grade
 from app.schemas.grade_schema import GradeCreateSchema, GradeResponseSchema, GradeUpdateSchema
-from typing import List
-from app.models.api_response import ApiResponse
+from typing import Any, Dict, List, Optional, Union
+from app.models.api_response import ApiResponse, CursorPage
+from app.utils.responses import api_response
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, parse_fields
 
 router = APIRouter()
 
@@ -17,14 +19,14 @@ def create_grade_route(grade: GradeCreateSchema):
     )
 
 # get all grades
-@router.get("/grades", response_model=ApiResponse[List[GradeResponseSchema]])
-def get_all_grade_route():
-    grade = get_all_grade()
-    return ApiResponse[List[GradeResponseSchema]](
-        status=True,
-        message="Students retrieved successfully",
-        data=grade
-    )
+@router.get("/grades", response_model=ApiResponse[CursorPage[Union[GradeResponseSchema, Dict[str, Any]]]])
+def get_all_grade_route(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    grade = get_all_grade(cursor, limit, parse_fields(fields, GradeResponseSchema))
+    return api_response(grade, "Students retrieved successfully")
     
 # get grade by id
 @router.get("/grade/{grade_id}", response_model=ApiResponse[GradeResponseSchema])
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Union
-from app.models.api_response import ApiResponse
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Union, Optional
+from app.models.api_response import ApiResponse, PaginatedData, CursorPage
+from app.utils.responses import api_response
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
 from app.schemas.student_class_assign_schema import (
     StudentClassAssignmentCreateSchema, 
     StudentClassAssignmentUpdateSchema, 
     UnassignedStudentResponseSchema,
-    StudentClassAssignmentResponseSchema
+    StudentClassAssignmentResponseSchema,
+    StudentFilterResponseSchema,
+    PromotionRequestSchema,
+    PromotionResultSchema
 )
 
 from app.services.students_class_assign_services import assign_students_to_class, list_unassigned_students, update_student_assignment, remove_student_assignment
+from app.services.filters_services import filter_students
+from app.services.promotion_services import promote_students
 from bson import ObjectId
 
 router = APIRouter()
@@ -34,18 +41,37 @@ def assign_students_to_class_route(
         raise HTTPException(status_code=500, detail=str(e))
 
     
-@router.get("/students/unassigned", response_model=ApiResponse[List[UnassignedStudentResponseSchema]])
-def get_unassigned_students_route():
+@router.get("/students/unassigned", response_model=ApiResponse[CursorPage[UnassignedStudentResponseSchema]])
+def get_unassigned_students_route(
+    academic_year: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT)
+):
     """
-    Get a list of students who are not assigned to any class or grade.
+    Get a page of students who are not assigned to any class, optionally for one academic year.
     """
     try:
-        unassigned_students = list_unassigned_students()
-        return ApiResponse[List[UnassignedStudentResponseSchema]](
-            status=True,
-            message="Unassigned students retrieved successfully",
-            data=unassigned_students
-        )
+        unassigned_students = list_unassigned_students(academic_year, cursor, limit)
+        return api_response(unassigned_students, "Unassigned students retrieved successfully")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.get("/students/filter", response_model=ApiResponse[PaginatedData[StudentFilterResponseSchema]])
+def filter_students_route(
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    academic_year: Optional[int] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Get students assigned to a grade, class and/or academic year, with their grade and class details.
+    """
+    try:
+        students_page = filter_students(grade_id, class_id, academic_year, page, limit)
+        return api_response(students_page, "Students retrieved successfully")
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -88,3 +114,12 @@ def remove_student_assignment_route(student_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Year-end promotion: assign every student of the mapped classes for the next academic year
+@router.post("/students/promote", response_model=ApiResponse[PromotionResultSchema])
+async def promote_students_route(request: PromotionRequestSchema):
+    result = await promote_students(request)
+    return ApiResponse[PromotionResultSchema](
+        status=True,
+        message="Promotion dry run completed" if request.dry_run else "Students promoted successfully",
+        data=result
+    )
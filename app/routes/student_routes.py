@@ -1,36 +1,52 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Union
-from app.schemas.student_schema import StudentCreateSchema, StudentResponseSchema, StudentUpdateSchema
-from app.services.student_services import create_student, get_all_students, get_student_by_id, get_student_by_index_number, update_student, soft_delete_student, change_students_status
-from app.models.api_response import ApiResponse
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File
+from typing import Any, Dict, List, Optional, Union
+from app.schemas.student_schema import StudentCreateSchema, StudentResponseSchema, StudentUpdateSchema, StudentImportResultSchema
+from app.services.student_services import import_students, create_student, get_all_students, get_student_by_id, get_student_by_index_number, update_student, soft_delete_student, change_students_status
+from app.models.api_response import ApiResponse, CursorPage
+from app.utils.responses import api_response
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, parse_fields
 
 
 router = APIRouter()
 
 # create student
 @router.post("/students", response_model=ApiResponse[StudentResponseSchema], status_code=201)
-def create_new_student(student : StudentCreateSchema):
-    created_student = create_student(student)
+async def create_new_student(student : StudentCreateSchema):
+    created_student = await create_student(student)
     return ApiResponse[StudentResponseSchema](
         status=True,
         message="Student created successfully",
         data=created_student
     )
     
-# get all student
-@router.get("/students", response_model=ApiResponse[List[StudentResponseSchema]])
-def get_all_students_route():
-    students = get_all_students()
-    return ApiResponse[List[StudentResponseSchema]](
+# bulk import students from a CSV or NDJSON file
+@router.post("/students/import", response_model=ApiResponse[StudentImportResultSchema])
+async def import_students_route(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON with one student per line"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the file extension")
+):
+    file_format = format or ("ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv")
+    result = await import_students(file.file, file_format)
+    return ApiResponse[StudentImportResultSchema](
         status=True,
-        message="Students retrieved successfully",
-        data=students
+        message=f"{result.created} students imported, {result.failed} rows failed",
+        data=result
     )
     
+# get all student
+@router.get("/students", response_model=ApiResponse[CursorPage[Union[StudentResponseSchema, Dict[str, Any]]]])
+async def get_all_students_route(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    students = await get_all_students(cursor, limit, parse_fields(fields, StudentResponseSchema))
+    return api_response(students, "Students retrieved successfully")
+    
 # get student by id
 @router.get("/students/{student_id}", response_model=ApiResponse[StudentResponseSchema])
-def get_student(student_id: str):
-    student_data = get_student_by_id(student_id)
+async def get_student(student_id: str):
+    student_data = await get_student_by_id(student_id)
     if not student_data:
         raise HTTPException(status_code=404, detail="Student not found")
     return ApiResponse[StudentResponseSchema](
@@ -41,8 +57,8 @@ def get_student(student_id: str):
     
 # Update Student
 @router.put("/students/{student_id}", response_model=ApiResponse[StudentResponseSchema])
-def update_student_route(student_id: str, student: StudentUpdateSchema):
-    updated_student = update_student(student_id, student)
+async def update_student_route(student_id: str, student: StudentUpdateSchema):
+    updated_student = await update_student(student_id, student)
     if not updated_student:
         raise HTTPException(status_code=404, detail="Student not found")
     return ApiResponse[StudentResponseSchema](
@@ -53,8 +69,8 @@ def update_student_route(student_id: str, student: StudentUpdateSchema):
     
 # Soft Delete Student
 @router.delete("/students/{student_id}", response_model=ApiResponse[None])
-def delete_student_route(student_id: str):
-    success = soft_delete_student(student_id)
+async def delete_student_route(student_id: str):
+    success = await soft_delete_student(student_id)
     if not success:
         raise HTTPException(status_code=404, detail="Student not found or already deleted")
     return ApiResponse[None](
@@ -65,9 +81,9 @@ def delete_student_route(student_id: str):
     
 # Get a student by their index number.
 @router.get("/students/index/{index_number}", response_model=ApiResponse[StudentResponseSchema])
-def get_student_by_index(index_number: str):
+async def get_student_by_index(index_number: str):
     try:
-        student = get_student_by_index_number(index_number)
+        student = await get_student_by_index_number(index_number)
         return ApiResponse[StudentResponseSchema](
             status=True,
             message="Student retrieved successfully",
@@ -80,10 +96,10 @@ def get_student_by_index(index_number: str):
     
 # Change Student Status
 @router.put("/students/status", response_model=ApiResponse[dict])
-def change_students_status_route(student_ids: Union[str, List[str]]):
+async def change_students_status_route(student_ids: Union[str, List[str]]):
    
     try:
-        result = change_students_status(student_ids)
+        result = await change_students_status(student_ids)
         return ApiResponse[dict](
             status=True,
             message=result["message"],
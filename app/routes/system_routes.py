@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional
+from app.models.api_response import ApiResponse
+from app.utils.reference_cache import reference_cache
+from app.services.attendance_stream_services import attendance_event_hub
+from app.database.database import async_job_runs
+from app.utils.metrics import metrics
+from app.utils.responses import api_response
+from app.services.health_services import check_readiness, runtime_stats
+
+router = APIRouter()
+
+# Reference cache hit/miss counters
+@router.get("/system/cache-stats", response_model=ApiResponse[dict])
+def get_cache_stats_route():
+    return ApiResponse[dict](
+        status=True,
+        message="Cache statistics retrieved successfully",
+        data=reference_cache.stats()
+    )
+
+# Live attendance stream subscribers and drops
+@router.get("/system/stream-stats", response_model=ApiResponse[dict])
+def get_stream_stats_route():
+    return ApiResponse[dict](
+        status=True,
+        message="Stream statistics retrieved successfully",
+        data=attendance_event_hub.stats()
+    )
+
+# Most recent scheduled job runs
+@router.get("/system/job-runs", response_model=ApiResponse[List[dict]])
+async def get_job_runs_route(job: Optional[str] = None, limit: int = Query(20, ge=1, le=100)):
+    query = {"job": job} if job else {}
+    runs = await async_job_runs.find(query).sort("started_at", -1).limit(limit).to_list(length=limit)
+    for run in runs:
+        run["_id"] = str(run["_id"])
+    return ApiResponse[List[dict]](
+        status=True,
+        message="Job runs retrieved successfully",
+        data=runs
+    )
+
+# Request latency and MongoDB usage in the Prometheus text format
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics_route():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Liveness for the load balancer, no I/O
+@router.get("/healthz", response_model=ApiResponse[dict])
+def healthz_route():
+    return ApiResponse[dict](
+        status=True,
+        message="Alive",
+        data={"status": "ok"}
+    )
+
+# Readiness: Mongo reachable (cached ping), scheduler running, reference cache warm
+@router.get("/readyz", response_model=ApiResponse[dict])
+async def readyz_route():
+    ready, checks = await check_readiness()
+    if not ready:
+        return api_response(checks, "Not ready", status=False, status_code=503)
+    return api_response(checks, "Ready")
+
+# Pool checkout waits, in-flight requests and event-loop lag for this worker
+@router.get("/system/runtime-stats", response_model=ApiResponse[dict])
+def get_runtime_stats_route():
+    return ApiResponse[dict](
+        status=True,
+        message="Runtime statistics retrieved successfully",
+        data=runtime_stats()
+    )
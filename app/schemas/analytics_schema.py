@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+
+class StudentAttendanceStatsSchema(BaseModel):
+    student_id: str
+    class_id: str = Field(..., description="Class of the student's latest record in the range")
+    days_recorded: int
+    days_present: int
+    attendance_rate: float
+    current_absence_streak: int
+    longest_absence_streak: int
+
+class ClassAttendanceStatsSchema(BaseModel):
+    class_id: str
+    students: int
+    records: int
+    present: int
+    attendance_rate: float
+    chronic_absentees: int
+
+class AttendanceAnalyticsSchema(BaseModel):
+    start_date: date
+    end_date: date
+    threshold: float = Field(..., description="Students with an attendance rate below this are chronically absent")
+    records: int
+    students: List[StudentAttendanceStatsSchema]
+    classes: List[ClassAttendanceStatsSchema]
+    elapsed_seconds: float = Field(0.0, description="Time to load and compute the statistics")
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
 from datetime import datetime, date, time
 
 class AttendanceCreateSchema(BaseModel):
@@ -9,9 +9,24 @@ class AttendanceCreateSchema(BaseModel):
     scan_date: date = Field(default_factory=date.today, description="Attendance date")
     time: str = Field(default_factory=lambda: datetime.now().strftime("%H:%M:%S"), description="Scan time")
     status: str = Field(default="P", description="Attendance status ('P' for present)")
+    qr_signature: Optional[str] = Field(None, description="Signature from the QR payload, skips the student lookup on the fast scan path")
     created_at: datetime = datetime.utcnow()
     updated_at: Optional[datetime] = None
     deleted_at: Optional[datetime] = None
+
+    # Stored zero-padded, the daily summaries compare scan times as strings
+    @validator("time")
+    def normalize_time(cls, value: str):
+        try:
+            return datetime.strptime(value.strip(), "%H:%M:%S").strftime("%H:%M:%S")
+        except ValueError:
+            raise ValueError("Scan time must be HH:MM:SS")
+
+class QrSignatureResponseSchema(BaseModel):
+    student_id: str
+    grade_id: str
+    class_id: str
+    qr_signature: str
     
 class AttendanceResponseSchema(BaseModel):
     id: str
@@ -23,4 +38,59 @@ class AttendanceResponseSchema(BaseModel):
     status: str
     created_at: datetime = datetime.utcnow()
     updated_at: Optional[datetime] = None
-    deleted_at: Optional[datetime] = None
\ No newline at end of file
+    deleted_at: Optional[datetime] = None
+
+# Batch of buffered scans replayed by an offline gate device
+class AttendanceBatchSchema(BaseModel):
+    scans: List[AttendanceCreateSchema] = Field(..., min_length=1, max_length=1000, description="Buffered scans, oldest first")
+
+class AttendanceScanOutcomeSchema(BaseModel):
+    index: int
+    student_id: str
+    scan_date: date
+    status: str = Field(..., description="'created', 'duplicate' or 'invalid'")
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+class AttendanceBatchResultSchema(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    outcomes: List[AttendanceScanOutcomeSchema]
+
+
+# Materialized per-class attendance counts for a day
+class AttendanceDailySummarySchema(BaseModel):
+    scan_date: date
+    grade_id: str
+    class_id: str
+    present: int
+    absent: int
+    late: int
+    updated_at: Optional[datetime] = None
+
+class AttendanceGradeSummarySchema(BaseModel):
+    scan_date: date
+    grade_id: str
+    present: int
+    absent: int
+    late: int
+    classes: int
+
+# One student on a class roll sheet; status/time are None until scanned or marked absent
+class AttendanceRollEntrySchema(BaseModel):
+    student_id: str
+    name: str
+    index_number: str
+    status: Optional[str] = None
+    time: Optional[str] = None
+
+class AttendanceRollSheetSchema(BaseModel):
+    class_id: str
+    grade_id: str
+    scan_date: date
+    academic_year: int
+    present: int
+    absent: int
+    not_marked: int
+    students: List[AttendanceRollEntrySchema]
@@ -32,4 +32,44 @@ class StudentClassAssignmentResponseSchema(BaseModel):
 class UnassignedStudentResponseSchema(BaseModel):
     id: str
     name: str
-    index_number: str
\ No newline at end of file
+    index_number: str
+
+class StudentFilterResponseSchema(BaseModel):
+    student_id: str
+    student_name: str
+    student_index_number: str
+    grade_id: str
+    grade_level: int
+    class_id: str
+    class_name: str
+    academic_year: int
+
+# Year-end promotion: every student in the source class moves to the target class for the next year
+class PromotionMappingSchema(BaseModel):
+    from_grade_id: str = Field(..., description="Grade the students are in this year")
+    from_class_id: str = Field(..., description="Class the students are in this year")
+    to_grade_id: str = Field(..., description="Grade for next year")
+    to_class_id: str = Field(..., description="Class for next year")
+
+class PromotionRequestSchema(BaseModel):
+    from_academic_year: int = Field(..., description="Academic year being closed; students are assigned for the year after")
+    mappings: List[PromotionMappingSchema] = Field(..., min_length=1, description="One entry per source class")
+    dry_run: bool = Field(default=False, description="Only report what would be assigned")
+
+class PromotionMappingResultSchema(BaseModel):
+    from_class_id: str
+    to_class_id: str
+    candidates: int
+    promoted: int
+    already_assigned: int
+
+class PromotionResultSchema(BaseModel):
+    run_id: str
+    dry_run: bool
+    from_academic_year: int
+    to_academic_year: int
+    candidates: int
+    promoted: int
+    already_assigned: int
+    mappings: List[PromotionMappingResultSchema]
+    elapsed_seconds: float
@@ -111,3 +111,23 @@ class StudentResponseSchema(BaseModel):
     
 
 
+
+
+# Student with the grade and class of their latest assignment
+class StudentWithClassResponseSchema(StudentResponseSchema):
+    grade_level: Optional[int] = None
+    class_name: Optional[str] = None
+    academic_year: Optional[int] = None
+
+
+# Bulk import report
+class StudentImportRowErrorSchema(BaseModel):
+    row: int
+    index_number: Optional[str] = None
+    errors: List[str]
+
+class StudentImportResultSchema(BaseModel):
+    total_rows: int
+    created: int
+    failed: int
+    errors: List[StudentImportRowErrorSchema]
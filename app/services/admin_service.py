@@ -1,33 +1,29 @@
-from app.database.database import admins
+from app.database.database import async_admins as admins
 from app.schemas.admin_shema import AdminCreateSchema, AdminUpdateSchema, AdminResponseSchema
 from bson import ObjectId
 from fastapi import HTTPException
 from datetime import datetime
-from passlib.context import CryptContext
-
-# Password Hasing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Hash password function
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+from typing import List, Optional
+from app.models.api_response import CursorPage
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, after_cursor, projection_for, project_document, split_page
+from app.utils.password_hasher import hash_password_async
 
 # Create Admin Service
-def create_admin(admin: AdminCreateSchema) -> AdminResponseSchema:
+async def create_admin(admin: AdminCreateSchema) -> AdminResponseSchema:
     
-    existing_admin = admins.find_one({"email": admin.email})
+    existing_admin = await admins.find_one({"email": admin.email})
     
     if existing_admin:
         raise HTTPException(status_code=400, detail="Email already exists. Please use a different email.")
 
     # Convert Pydantic model to dictionary
     admin_data = admin.dict()
-    admin_data["password"] = hash_password(admin_data["password"])
+    admin_data["password"] = await hash_password_async(admin_data["password"])
     admin_data["created_at"] = datetime.utcnow()
     admin_data["deleted_at"] = None  # Soft delete handling
 
     # Insert into MongoDB
-    result = admins.insert_one(admin_data)
+    result = await admins.insert_one(admin_data)
     
     # Convert _id to string
     admin_data["id"] = str(result.inserted_id)  # Use 'id' instead of '_id'
@@ -35,21 +31,31 @@ def create_admin(admin: AdminCreateSchema) -> AdminResponseSchema:
     return AdminResponseSchema(**admin_data)  # Return correct schema format
 
 # Get All Admins Service (Exclude Soft Deleted)
-def get_all_admins():
-    admins_list = admins.find({"deleted_at": None}).to_list(None)
-    return [
-        AdminResponseSchema(
-            id=str(admin["_id"]),
-            name=admin["name"],
-            email=admin["email"],
-            image=admin.get("image"),
-            created_at=admin["created_at"]
-        ) for admin in admins_list
-    ]
+async def get_all_admins(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT, fields: Optional[List[str]] = None) -> CursorPage:
+    query = after_cursor({"deleted_at": None}, cursor)
+    projection = projection_for(fields) if fields is not None else {"password": 0}
+    admins_list, next_cursor = split_page(await admins.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(None), limit)
+
+    if fields is not None:
+        return CursorPage(items=[project_document(admin, fields) for admin in admins_list], limit=limit, next_cursor=next_cursor)
+
+    return CursorPage(
+        items=[
+            AdminResponseSchema(
+                id=str(admin["_id"]),
+                name=admin["name"],
+                email=admin["email"],
+                image=admin.get("image"),
+                created_at=admin["created_at"]
+            ) for admin in admins_list
+        ],
+        limit=limit,
+        next_cursor=next_cursor
+    )
     
 # Get Admin By ID Service
-def get_admin_by_id(admin_id: str) -> AdminResponseSchema:
-    admin =  admins.find_one({"_id": ObjectId(admin_id), "deleted_at": None})
+async def get_admin_by_id(admin_id: str) -> AdminResponseSchema:
+    admin = await admins.find_one({"_id": ObjectId(admin_id), "deleted_at": None})
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     
@@ -62,13 +68,13 @@ def get_admin_by_id(admin_id: str) -> AdminResponseSchema:
     )
 
 # Update Admin Service
-def update_admin(admin_id: str, admin: AdminUpdateSchema) -> AdminResponseSchema:
+async def update_admin(admin_id: str, admin: AdminUpdateSchema) -> AdminResponseSchema:
     update_data = {k: v for k, v in admin.dict().items() if v is not None}
     if "password" in update_data:
-        update_data["password"] = hash_password(update_data["password"])
+        update_data["password"] = await hash_password_async(update_data["password"])
     update_data["updated_at"] = datetime.utcnow()
 
-    result = admins.update_one(
+    result = await admins.update_one(
         {"_id": ObjectId(admin_id), "deleted_at": None},
         {"$set": update_data}
     )
@@ -76,15 +82,15 @@ def update_admin(admin_id: str, admin: AdminUpdateSchema) -> AdminResponseSchema
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Admin not found or deleted")
 
-    return get_admin_by_id(admin_id)
+    return await get_admin_by_id(admin_id)
 
 # Soft Delete Admin Service
-def soft_delete_admin(admin_id: str):
-    admin = admins.find_one({"_id": ObjectId(admin_id)})  # No 'await' needed
+async def soft_delete_admin(admin_id: str):
+    admin = await admins.find_one({"_id": ObjectId(admin_id)})
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
 
-    result = admins.update_one(
+    result = await admins.update_one(
         {"_id": ObjectId(admin_id)}, {"$set": {"deleted_at": datetime.utcnow()}}
     )
     
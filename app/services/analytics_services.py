@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import time
+import numpy as np
+from datetime import date
+from typing import Any, Dict, Optional
+from fastapi import HTTPException
+from app.database.database import async_attendance
+from app.schemas.analytics_schema import AttendanceAnalyticsSchema, StudentAttendanceStatsSchema, ClassAttendanceStatsSchema
+
+ANALYTICS_CURSOR_BATCH_SIZE = 1000
+
+def _attendance_columns_pipeline(query: dict) -> list:
+    """
+    One row per (student, class) with that pair's days, as day numbers since
+    the epoch, and present flags in matching order, so the driver decodes a
+    few thousand small arrays instead of one document per scan.
+    """
+    return [
+        {"$match": query},
+        {"$group": {
+            "_id": {"student_id": "$student_id", "class_id": {"$ifNull": ["$class_id", "N/A"]}},
+            "days": {"$push": {"$toLong": {"$divide": [{"$toLong": {"$dateFromString": {"dateString": "$scan_date", "format": "%Y-%m-%d"}}}, 86400000]}}},
+            "present": {"$push": {"$ne": ["$status", "A"]}},
+        }},
+    ]
+
+# Pull the (student, class, day, present) columns for a date range into numpy
+# arrays. Student and class ids are factorized into integer codes while
+# reading, `student_keys` and `class_keys` map the codes back to ids.
+async def load_attendance_columns(
+    start_date: date,
+    end_date: date,
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None
+) -> Dict[str, Any]:
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+
+    query = {"scan_date": {"$gte": str(start_date), "$lte": str(end_date)}, "deleted_at": None}
+    if grade_id:
+        query["grade_id"] = grade_id
+    if class_id:
+        query["class_id"] = class_id
+
+    student_index: Dict[str, int] = {}
+    class_index: Dict[str, int] = {}
+    group_students, group_classes, group_sizes, days, present = [], [], [], [], []
+    cursor = async_attendance.aggregate(_attendance_columns_pipeline(query), allowDiskUse=True, batchSize=ANALYTICS_CURSOR_BATCH_SIZE)
+    async for group in cursor:
+        group_students.append(student_index.setdefault(group["_id"]["student_id"], len(student_index)))
+        group_classes.append(class_index.setdefault(group["_id"]["class_id"], len(class_index)))
+        group_sizes.append(len(group["days"]))
+        days.append(group["days"])
+        present.append(group["present"])
+
+    total = sum(group_sizes)
+    sizes = np.array(group_sizes, dtype=np.int64)
+    return {
+        "student_keys": list(student_index),
+        "class_keys": list(class_index),
+        "student_code": np.repeat(np.array(group_students, dtype=np.int64), sizes),
+        "class_code": np.repeat(np.array(group_classes, dtype=np.int64), sizes),
+        "scan_date": np.fromiter(itertools.chain.from_iterable(days), dtype=np.int64, count=total).astype("datetime64[D]"),
+        "present": np.fromiter(itertools.chain.from_iterable(present), dtype=bool, count=total),
+    }
+
+def compute_attendance_stats(columns: Dict[str, Any], start_date: date, end_date: date, threshold: float) -> AttendanceAnalyticsSchema:
+    """
+    Per-student and per-class rates, absence streaks and chronic absence
+    over the columns from `load_attendance_columns`. Streaks count
+    consecutive recorded school days, in date order.
+    """
+    total = len(columns["student_code"])
+    if total == 0:
+        return AttendanceAnalyticsSchema(start_date=start_date, end_date=end_date, threshold=threshold, records=0, students=[], classes=[])
+
+    student_keys, student_codes = columns["student_keys"], columns["student_code"]
+    class_keys, class_codes = columns["class_keys"], columns["class_code"]
+    present = columns["present"]
+    n_students = len(student_keys)
+
+    # Per-student rates
+    days_recorded = np.bincount(student_codes, minlength=n_students)
+    days_present = np.bincount(student_codes, weights=present, minlength=n_students).astype(np.int64)
+    rates = days_present / days_recorded
+
+    # Order records by student, then date, and split them into runs of equal status
+    order = np.lexsort((columns["scan_date"], student_codes))
+    ordered_students = student_codes[order]
+    ordered_absent = ~present[order]
+    run_starts = np.flatnonzero(np.r_[True, (ordered_students[1:] != ordered_students[:-1]) | (ordered_absent[1:] != ordered_absent[:-1])])
+    run_lengths = np.diff(np.r_[run_starts, total])
+    run_students = ordered_students[run_starts]
+    run_absent = ordered_absent[run_starts]
+
+    longest_streak = np.zeros(n_students, dtype=np.int64)
+    np.maximum.at(longest_streak, run_students[run_absent], run_lengths[run_absent])
+
+    last_runs = np.flatnonzero(np.r_[run_students[1:] != run_students[:-1], True])
+    current_streak = np.zeros(n_students, dtype=np.int64)
+    current_streak[run_students[last_runs]] = np.where(run_absent[last_runs], run_lengths[last_runs], 0)
+
+    # Class of each student's latest record
+    last_records = order[np.flatnonzero(np.r_[ordered_students[1:] != ordered_students[:-1], True])]
+    student_class_codes = np.empty(n_students, dtype=np.int64)
+    student_class_codes[student_codes[last_records]] = class_codes[last_records]
+
+    # Per-class rates
+    n_classes = len(class_keys)
+    class_records = np.bincount(class_codes, minlength=n_classes)
+    class_present = np.bincount(class_codes, weights=present, minlength=n_classes).astype(np.int64)
+    class_students = np.bincount(student_class_codes, minlength=n_classes)
+    chronic = rates < threshold
+    class_chronic = np.bincount(student_class_codes[chronic], minlength=n_classes)
+
+    students = [
+        StudentAttendanceStatsSchema(
+            student_id=student_keys[i],
+            class_id=class_keys[student_class_codes[i]],
+            days_recorded=int(days_recorded[i]),
+            days_present=int(days_present[i]),
+            attendance_rate=round(float(rates[i]), 4),
+            current_absence_streak=int(current_streak[i]),
+            longest_absence_streak=int(longest_streak[i])
+        )
+        for i in range(n_students)
+    ]
+    classes = [
+        ClassAttendanceStatsSchema(
+            class_id=class_keys[i],
+            students=int(class_students[i]),
+            records=int(class_records[i]),
+            present=int(class_present[i]),
+            attendance_rate=round(float(class_present[i] / class_records[i]), 4),
+            chronic_absentees=int(class_chronic[i])
+        )
+        for i in range(n_classes)
+    ]
+
+    return AttendanceAnalyticsSchema(
+        start_date=start_date,
+        end_date=end_date,
+        threshold=threshold,
+        records=total,
+        students=students,
+        classes=classes
+    )
+
+# Attendance statistics for a date range; the numpy work runs off the event loop
+async def get_attendance_analytics(
+    start_date: date,
+    end_date: date,
+    threshold: float,
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None
+) -> AttendanceAnalyticsSchema:
+    started = time.perf_counter()
+    columns = await load_attendance_columns(start_date, end_date, grade_id, class_id)
+    analytics = await asyncio.to_thread(compute_attendance_stats, columns, start_date, end_date, threshold)
+    analytics.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return analytics
@@ -0,0 +1,65 @@
+import csv
+import io
+import orjson
+from datetime import date
+from typing import AsyncIterator, List, Optional
+from fastapi import HTTPException
+from app.database.database import async_attendance
+
+EXPORT_FIELDS = ["id", "student_id", "grade_id", "class_id", "scan_date", "time", "status", "created_at"]
+
+# Rows are written to the response in chunks of roughly this many bytes
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_CURSOR_BATCH_SIZE = 5000
+
+def build_export_query(
+    start_date: date,
+    end_date: date,
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None
+) -> dict:
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+
+    # scan_date is stored as an ISO string, so string range comparison is date order
+    query = {"scan_date": {"$gte": str(start_date), "$lte": str(end_date)}, "deleted_at": None}
+    if grade_id:
+        query["grade_id"] = grade_id
+    if class_id:
+        query["class_id"] = class_id
+    return query
+
+async def _export_rows(query: dict) -> AsyncIterator[dict]:
+    projection = {field: 1 for field in EXPORT_FIELDS if field != "id"}
+    cursor = async_attendance.find(query, projection).sort("scan_date", 1).batch_size(EXPORT_CURSOR_BATCH_SIZE)
+    async for record in cursor:
+        record["id"] = str(record.pop("_id"))
+        yield record
+
+# Stream attendance as newline-delimited JSON
+async def stream_attendance_ndjson(query: dict) -> AsyncIterator[bytes]:
+    buffer: List[bytes] = []
+    size = 0
+    async for record in _export_rows(query):
+        line = orjson.dumps({field: record.get(field) for field in EXPORT_FIELDS}) + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+# Stream attendance as CSV with a header row
+async def stream_attendance_csv(query: dict) -> AsyncIterator[bytes]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_FIELDS)
+    async for record in _export_rows(query):
+        writer.writerow([record.get(field) for field in EXPORT_FIELDS])
+        if output.tell() >= EXPORT_CHUNK_BYTES:
+            yield output.getvalue().encode()
+            output.seek(0)
+            output.truncate(0)
+    if output.tell():
+        yield output.getvalue().encode()
@@ -0,0 +1,100 @@
+from datetime import date
+from typing import Iterable, Optional
+from bson import ObjectId
+from fastapi import HTTPException
+from app.database.database import async_student_class_assignments, async_students, async_attendance, async_attendance_daily_summaries
+from app.schemas.attendance_schema import AttendanceRollSheetSchema, AttendanceRollEntrySchema
+from app.utils.reference_cache import TTLCache, reference_cache
+from app.config.config import ROLL_SHEET_CACHE_TTL_SECONDS, ROLL_SHEET_CACHE_MAX_ENTRIES
+
+# Roll sheets keyed by (class_id, scan_date, academic_year)
+roll_sheet_cache = TTLCache(ROLL_SHEET_CACHE_MAX_ENTRIES, ROLL_SHEET_CACHE_TTL_SECONDS)
+
+def _roll_sheet_pipeline(class_id: ObjectId, scan_date: str, academic_year: int) -> list:
+    """
+    Students assigned to the class for the year, each joined with their
+    attendance row for the day, if any.
+    """
+    return [
+        {"$match": {"class_id": class_id, "academic_year": academic_year, "deleted_at": None}},
+        {"$lookup": {
+            "from": async_students.name,
+            "localField": "student_id",
+            "foreignField": "_id",
+            "pipeline": [
+                {"$match": {"status": True, "deleted_at": None}},
+                {"$project": {"name": 1, "index_number": 1}},
+            ],
+            "as": "student",
+        }},
+        {"$unwind": "$student"},
+        {"$project": {"_id": 0, "student": 1, "sid": {"$toString": "$student_id"}}},
+        {"$lookup": {
+            "from": async_attendance.name,
+            "localField": "sid",
+            "foreignField": "student_id",
+            "pipeline": [
+                {"$match": {"scan_date": scan_date, "deleted_at": None}},
+                {"$project": {"_id": 0, "status": 1, "time": 1}},
+                {"$limit": 1},
+            ],
+            "as": "mark",
+        }},
+        {"$project": {
+            "student_id": "$sid",
+            "name": "$student.name",
+            "index_number": "$student.index_number",
+            "status": {"$arrayElemAt": ["$mark.status", 0]},
+            "time": {"$arrayElemAt": ["$mark.time", 0]},
+        }},
+        {"$sort": {"index_number": 1}},
+    ]
+
+# Last change to the class's attendance that day, as seen by any worker
+async def _roll_version(class_id: str, scan_date: str):
+    summary = await async_attendance_daily_summaries.find_one(
+        {"scan_date": scan_date, "class_id": class_id},
+        {"_id": 0, "updated_at": 1},
+        sort=[("updated_at", -1)]
+    )
+    return summary["updated_at"] if summary else None
+
+async def get_class_roll_sheet(class_id: str, scan_date: date, academic_year: Optional[int] = None) -> AttendanceRollSheetSchema:
+    class_doc = await reference_cache.get_class_async(class_id)
+    if class_doc is None:
+        raise HTTPException(status_code=404, detail="Class not found")
+
+    day = str(scan_date)
+    year = academic_year or scan_date.year
+    key = (class_id, day, year)
+
+    # Read the version before aggregating, so a cached sheet is never older than its version
+    version = await _roll_version(class_id, day)
+    cached = roll_sheet_cache.get(key, None)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    entries = [
+        AttendanceRollEntrySchema(**row)
+        async for row in async_student_class_assignments.aggregate(_roll_sheet_pipeline(ObjectId(class_id), day, year))
+    ]
+    absent = sum(1 for entry in entries if entry.status == "A")
+    not_marked = sum(1 for entry in entries if entry.status is None)
+    sheet = AttendanceRollSheetSchema(
+        class_id=class_id,
+        grade_id=str(class_doc["grade_id"]),
+        scan_date=scan_date,
+        academic_year=year,
+        present=len(entries) - absent - not_marked,
+        absent=absent,
+        not_marked=not_marked,
+        students=entries
+    )
+    roll_sheet_cache.set(key, (version, sheet))
+    return sheet
+
+# Drop cached sheets for the classes and days touched by newly written attendance
+def invalidate_roll_sheets(records: Iterable[dict]):
+    touched = {(record["class_id"], record["scan_date"]) for record in records}
+    if touched:
+        roll_sheet_cache.invalidate_where(lambda key: key[:2] in touched)
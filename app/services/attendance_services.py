@@ -1,35 +1,51 @@
+import time
 from bson import ObjectId, errors
-from typing import List
+from typing import List, Optional, Tuple
 from datetime import datetime, date
 from fastapi import HTTPException, status
 from app.database.database import students, grades, classes, student_class_assignments, attendance
-from pymongo.errors import DuplicateKeyError, PyMongoError
-from app.schemas.attendance_schema import AttendanceCreateSchema, AttendanceResponseSchema
+from app.database.database import async_students, async_grades, async_classes, async_attendance
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from app.config.config import ABSENT_INSERT_CHUNK_SIZE
+from app.schemas.attendance_schema import AttendanceCreateSchema, AttendanceResponseSchema, QrSignatureResponseSchema, AttendanceScanOutcomeSchema, AttendanceBatchResultSchema
+from app.utils.reference_cache import reference_cache
+from app.services.attendance_summary_services import record_scans, record_absences
+from app.services.attendance_stream_services import publish_scans
+from app.services.attendance_roll_services import invalidate_roll_sheets
+from app.utils.security import sign_qr_payload, verify_qr_signature
+from app.models.api_response import CursorPage
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, after_cursor, projection_for, project_document, split_page
 
-def validate_student(student_id: str):
-    if not students.find_one({"_id": ObjectId(student_id)}):
+# Bookkeeping after attendance rows are written
+async def _after_scans(records: List[dict]):
+    await record_scans(records)
+    invalidate_roll_sheets(records)
+    publish_scans(records)
+
+async def validate_student(student_id: str):
+    if not await async_students.find_one({"_id": ObjectId(student_id)}, {"_id": 1}):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found!")
 
-def validate_grade(grade_id: str):
-    if not grades.find_one({"_id": ObjectId(grade_id)}):
+async def validate_grade(grade_id: str):
+    if not await reference_cache.has_grade(grade_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Grade not found!")
 
-def validate_class(class_id: str):
-    if not classes.find_one({"_id": ObjectId(class_id)}):
+async def validate_class(class_id: str):
+    if not await reference_cache.has_class(class_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Class not found!")
 
-def mark_attendance(attendance_data: AttendanceCreateSchema) -> AttendanceResponseSchema:
+async def mark_attendance(attendance_data: AttendanceCreateSchema) -> AttendanceResponseSchema:
     student_id = attendance_data.student_id
     grade_id = attendance_data.grade_id
     class_id = attendance_data.class_id
     today_date = str(attendance_data.scan_date)
     scan_time = attendance_data.time
 
-    validate_student(student_id)
-    validate_grade(grade_id)
-    validate_class(class_id)
+    await validate_student(student_id)
+    await validate_grade(grade_id)
+    await validate_class(class_id)
 
-    existing_attendance = attendance.find_one({
+    existing_attendance = await async_attendance.find_one({
         "student_id": student_id,
         "scan_date": today_date
     })
@@ -49,62 +65,304 @@ def mark_attendance(attendance_data: AttendanceCreateSchema) -> AttendanceRespon
         "deleted_at": None
     }
 
-    result = attendance.insert_one(new_attendance)
+    try:
+        result = await async_attendance.insert_one(new_attendance)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Attendance already marked for today!")
+
+    await _after_scans([new_attendance])
+    new_attendance["id"] = str(result.inserted_id)
+    return AttendanceResponseSchema(**new_attendance)
+
+# Fast QR scan: reference ids come from the in-process cache, the student is
+# trusted from a signed QR payload (or one projected lookup), and duplicates
+# are caught by the (student_id, scan_date) unique index on insert
+async def mark_attendance_fast(attendance_data: AttendanceCreateSchema) -> AttendanceResponseSchema:
+    student_id = attendance_data.student_id
+    grade_id = attendance_data.grade_id
+    class_id = attendance_data.class_id
+
+    if not all(ObjectId.is_valid(value) for value in (student_id, grade_id, class_id)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format")
+
+    if not await reference_cache.has_grade(grade_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Grade not found!")
+
+    if not await reference_cache.has_class(class_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Class not found!")
+
+    if not verify_qr_signature(student_id, grade_id, class_id, attendance_data.qr_signature):
+        await validate_student(student_id)
+
+    new_attendance = {
+        "student_id": student_id,
+        "grade_id": grade_id,
+        "class_id": class_id,
+        "scan_date": str(attendance_data.scan_date),
+        "time": attendance_data.time,
+        "status": "P",
+        "created_at": datetime.utcnow(),
+        "updated_at": None,
+        "deleted_at": None
+    }
+
+    try:
+        result = await async_attendance.insert_one(new_attendance)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Attendance already marked for today!")
+
+    await _after_scans([new_attendance])
     new_attendance["id"] = str(result.inserted_id)
     return AttendanceResponseSchema(**new_attendance)
 
-def mark_absent_students():
-    today_date = str(date.today())
-    all_students = students.find({}, {"_id": 1, "grade_id": 1, "class_id": 1})
-
-    for student in all_students:
-        student_id = str(student["_id"])
-        grade_id = student.get("grade_id", "N/A")
-        class_id = student.get("class_id", "N/A")
-
-        existing_attendance = attendance.find_one({"student_id": student_id, "scan_date": today_date})
-
-        if not existing_attendance:
-            absent_record = {
-                "student_id": student_id,
-                "grade_id": grade_id,
-                "class_id": class_id,
-                "scan_date": today_date,
-                "time": "00:00:00",
-                "status": "A",
-                "created_at": datetime.utcnow(),
+async def _existing_ids(collection, ids: set, live_only: bool = False) -> set:
+    if not ids:
+        return set()
+    query = {"_id": {"$in": [ObjectId(value) for value in ids]}}
+    if live_only:
+        query["deleted_at"] = None
+    return {str(doc["_id"]) for doc in await collection.find(query, {"_id": 1}).to_list(None)}
+
+# Batch QR scans from offline gate devices: dedupe in memory, validate ids
+# with one $in query per collection and write with one unordered insert
+async def mark_attendance_batch(scans: List[AttendanceCreateSchema]) -> AttendanceBatchResultSchema:
+    outcomes: List[Optional[AttendanceScanOutcomeSchema]] = [None] * len(scans)
+    pending = []
+    seen = set()
+
+    def reject(index: int, scan: AttendanceCreateSchema, outcome_status: str, detail: str):
+        outcomes[index] = AttendanceScanOutcomeSchema(
+            index=index, student_id=scan.student_id, scan_date=scan.scan_date, status=outcome_status, detail=detail
+        )
+
+    for index, scan in enumerate(scans):
+        if not all(ObjectId.is_valid(value) for value in (scan.student_id, scan.grade_id, scan.class_id)):
+            reject(index, scan, "invalid", "Invalid ID format")
+            continue
+
+        key = (scan.student_id, str(scan.scan_date))
+        if key in seen:
+            reject(index, scan, "duplicate", "Duplicate scan in batch")
+            continue
+        seen.add(key)
+        pending.append((index, scan))
+
+    # Signed QR payloads don't need the student lookup
+    unsigned_students = {
+        scan.student_id for _, scan in pending
+        if not verify_qr_signature(scan.student_id, scan.grade_id, scan.class_id, scan.qr_signature)
+    }
+    known_students = await _existing_ids(async_students, unsigned_students)
+    known_grades = await _existing_ids(async_grades, {scan.grade_id for _, scan in pending}, live_only=True)
+    known_classes = await _existing_ids(async_classes, {scan.class_id for _, scan in pending}, live_only=True)
+
+    rows, documents = [], []
+    created_at = datetime.utcnow()
+    for index, scan in pending:
+        if scan.student_id in unsigned_students and scan.student_id not in known_students:
+            reject(index, scan, "invalid", "Student not found!")
+        elif scan.grade_id not in known_grades:
+            reject(index, scan, "invalid", "Grade not found!")
+        elif scan.class_id not in known_classes:
+            reject(index, scan, "invalid", "Class not found!")
+        else:
+            rows.append((index, scan))
+            documents.append({
+                "student_id": scan.student_id,
+                "grade_id": scan.grade_id,
+                "class_id": scan.class_id,
+                "scan_date": str(scan.scan_date),
+                "time": scan.time,
+                "status": "P",
+                "created_at": created_at,
                 "updated_at": None,
                 "deleted_at": None
-            }
-            attendance.insert_one(absent_record)
+            })
+
+    failed = set()
+    write_error = None
+    if documents:
+        try:
+            await async_attendance.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            failed = {err["index"] for err in write_errors}
+            if any(err.get("code") != 11000 for err in write_errors):
+                write_error = e
+
+    # Rows that did insert are counted and published even if the batch fails
+    await _after_scans([document for position, document in enumerate(documents) if position not in failed])
+    if write_error is not None:
+        raise write_error
+
+    # insert_many assigns _id on the documents before sending them
+    for position, (index, scan) in enumerate(rows):
+        if position in failed:
+            reject(index, scan, "duplicate", "Attendance already marked for today!")
+        else:
+            outcomes[index] = AttendanceScanOutcomeSchema(
+                index=index, student_id=scan.student_id, scan_date=scan.scan_date, status="created", id=str(documents[position]["_id"])
+            )
 
-    return {"message": "Absent students marked successfully!"}
+    return AttendanceBatchResultSchema(
+        created=sum(1 for outcome in outcomes if outcome.status == "created"),
+        duplicates=sum(1 for outcome in outcomes if outcome.status == "duplicate"),
+        invalid=sum(1 for outcome in outcomes if outcome.status == "invalid"),
+        outcomes=outcomes
+    )
+
+# Sign the QR payload for a student's current grade and class
+async def create_qr_signature(student_id: str, grade_id: str, class_id: str) -> QrSignatureResponseSchema:
+    await validate_student(student_id)
+    await validate_grade(grade_id)
+    await validate_class(class_id)
+
+    return QrSignatureResponseSchema(
+        student_id=student_id,
+        grade_id=grade_id,
+        class_id=class_id,
+        qr_signature=sign_qr_payload(student_id, grade_id, class_id)
+    )
+
+def _absent_candidates_pipeline(scan_date: str) -> list:
+    """
+    Active students with no attendance row for `scan_date`, resolved in one
+    aggregation together with the grade/class of their latest assignment.
+    """
+    return [
+        {"$match": {"status": True, "deleted_at": None}},
+        {"$project": {"_id": 1, "sid": {"$toString": "$_id"}}},
+        {"$lookup": {
+            "from": attendance.name,
+            "localField": "sid",
+            "foreignField": "student_id",
+            "pipeline": [
+                {"$match": {"scan_date": scan_date}},
+                {"$project": {"_id": 1}},
+                {"$limit": 1},
+            ],
+            "as": "marked",
+        }},
+        {"$match": {"marked": {"$size": 0}}},
+        {"$lookup": {
+            "from": student_class_assignments.name,
+            "localField": "_id",
+            "foreignField": "student_id",
+            "pipeline": [
+                {"$match": {"deleted_at": None}},
+                {"$sort": {"academic_year": -1}},
+                {"$limit": 1},
+                {"$project": {"grade_id": 1, "class_id": 1}},
+            ],
+            "as": "assignment",
+        }},
+        {"$project": {
+            "_id": 0,
+            "student_id": "$sid",
+            "grade_id": {"$ifNull": [{"$toString": {"$arrayElemAt": ["$assignment.grade_id", 0]}}, "N/A"]},
+            "class_id": {"$ifNull": [{"$toString": {"$arrayElemAt": ["$assignment.class_id", 0]}}, "N/A"]},
+        }},
+    ]
+
+def _insert_absent_chunk(records: List[dict]) -> Tuple[List[dict], int]:
+    """
+    Unordered insert of one chunk. Rows that hit the (student_id, scan_date)
+    unique index were marked concurrently and are counted, not raised.
+    Returns the inserted records and the number of duplicates.
+    """
+    try:
+        attendance.insert_many(records, ordered=False)
+        return records, 0
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in write_errors):
+            raise
+        failed = {err["index"] for err in write_errors}
+        return [record for position, record in enumerate(records) if position not in failed], len(failed)
+
+def mark_absent_students(scan_date: Optional[date] = None) -> dict:
+    started = time.perf_counter()
+    target_date = str(scan_date or date.today())
+
+    absent_marked = 0
+    already_marked = 0
+    candidates = 0
+    chunk = []
+    created_at = datetime.utcnow()
+
+    for candidate in students.aggregate(_absent_candidates_pipeline(target_date), allowDiskUse=True):
+        candidates += 1
+        chunk.append({
+            "student_id": candidate["student_id"],
+            "grade_id": candidate["grade_id"],
+            "class_id": candidate["class_id"],
+            "scan_date": target_date,
+            "time": "00:00:00",
+            "status": "A",
+            "created_at": created_at,
+            "updated_at": None,
+            "deleted_at": None
+        })
+
+        if len(chunk) >= ABSENT_INSERT_CHUNK_SIZE:
+            inserted, duplicates = _insert_absent_chunk(chunk)
+            record_absences(inserted)
+            invalidate_roll_sheets(inserted)
+            absent_marked += len(inserted)
+            already_marked += duplicates
+            chunk = []
+
+    if chunk:
+        inserted, duplicates = _insert_absent_chunk(chunk)
+        record_absences(inserted)
+        invalidate_roll_sheets(inserted)
+        absent_marked += len(inserted)
+        already_marked += duplicates
+
+    return {
+        "message": "Absent students marked successfully!",
+        "scan_date": target_date,
+        "candidates": candidates,
+        "absent_marked": absent_marked,
+        "already_marked": already_marked,
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
 
 # Get attendance records for a student
-def get_attendance_by_student(student_id: str) -> List[AttendanceResponseSchema]:
+async def get_attendance_by_student(student_id: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT, fields: Optional[List[str]] = None) -> CursorPage:
   
     try:
         ObjectId(student_id)
     except:
         raise HTTPException(status_code=400, detail="Invalid student ID format")
 
-    records = list(attendance.find({"student_id": student_id}))
+    query = after_cursor({"student_id": student_id}, cursor)
+    records = await async_attendance.find(query, projection_for(fields)).sort("_id", 1).limit(limit + 1).to_list(None)
 
-    if not records:
+    if not records and not cursor:
         raise HTTPException(status_code=404, detail="No attendance records found for this student")
 
-    return [
-        AttendanceResponseSchema(
-            id=str(record["_id"]),
-            student_id=record["student_id"],
-            grade_id=record["grade_id"],
-            class_id=record["class_id"],
-            scan_date=record["date"],
-            time=record["time"],
-            status=record["status"],
-            created_at=record.get("created_at", datetime.utcnow()),
-            updated_at=record.get("updated_at"),
-            deleted_at=record.get("deleted_at"),
-        )
-        for record in records
-    ]
\ No newline at end of file
+    records, next_cursor = split_page(records, limit)
+
+    if fields is not None:
+        return CursorPage(items=[project_document(record, fields) for record in records], limit=limit, next_cursor=next_cursor)
+
+    return CursorPage(
+        items=[
+            AttendanceResponseSchema(
+                id=str(record["_id"]),
+                student_id=record["student_id"],
+                grade_id=record["grade_id"],
+                class_id=record["class_id"],
+                scan_date=record["scan_date"],
+                time=record["time"],
+                status=record["status"],
+                created_at=record.get("created_at", datetime.utcnow()),
+                updated_at=record.get("updated_at"),
+                deleted_at=record.get("deleted_at"),
+            )
+            for record in records
+        ],
+        limit=limit,
+        next_cursor=next_cursor
+    )
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Dict, Optional, Set
+from app.config.config import EVENT_STREAM_QUEUE_SIZE
+
+
+class Subscriber:
+    """
+    One connected screen. Events matching its grade/class filter are queued
+    up to `max_queue`; a subscriber that falls further behind is dropped.
+    """
+
+    def __init__(self, grade_id: Optional[str], class_id: Optional[str], max_queue: int):
+        self.grade_id = grade_id
+        self.class_id = class_id
+        self.queue: "asyncio.Queue[Optional[dict]]" = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+
+    def matches(self, event: dict) -> bool:
+        if self.grade_id and event["grade_id"] != self.grade_id:
+            return False
+        if self.class_id and event["class_id"] != self.class_id:
+            return False
+        return True
+
+
+class AttendanceEventHub:
+    """
+    In-process fan-out of scan events to subscribers, used from the event
+    loop only. Publishing never waits on a slow client.
+    """
+
+    def __init__(self, max_queue: int = EVENT_STREAM_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self.published = 0
+        self.dropped_subscribers = 0
+        self._subscribers: Set[Subscriber] = set()
+
+    def subscribe(self, grade_id: Optional[str] = None, class_id: Optional[str] = None) -> Subscriber:
+        subscriber = Subscriber(grade_id, class_id, self.max_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def _drop(self, subscriber: Subscriber):
+        # Replace the backlog with the end-of-stream marker
+        self._subscribers.discard(subscriber)
+        subscriber.dropped = True
+        self.dropped_subscribers += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def publish(self, event: dict):
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            if not subscriber.matches(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+attendance_event_hub = AttendanceEventHub()
+
+def scan_event(record: dict) -> dict:
+    return {
+        "type": "scan",
+        "id": str(record["_id"]),
+        "student_id": record["student_id"],
+        "grade_id": record["grade_id"],
+        "class_id": record["class_id"],
+        "scan_date": record["scan_date"],
+        "time": record["time"],
+        "status": record["status"],
+    }
+
+# Broadcast newly written scans to live screens
+def publish_scans(records):
+    for record in records:
+        attendance_event_hub.publish(scan_event(record))
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional, Tuple
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+from app.database.database import attendance, attendance_daily_summaries, async_attendance, async_attendance_daily_summaries
+from app.config.config import LATE_AFTER
+from app.schemas.attendance_schema import AttendanceDailySummarySchema, AttendanceGradeSummarySchema
+
+SummaryKey = Tuple[str, str, str]
+
+def is_late(record: dict) -> bool:
+    # Scan times are zero-padded "HH:MM:SS", so string order is time order
+    return record["status"] == "P" and record["time"] > LATE_AFTER
+
+def _summary_updates(records: Iterable[dict]) -> List[UpdateOne]:
+    """
+    One $inc upsert per (scan_date, grade_id, class_id) touched by `records`.
+    """
+    counts: Dict[SummaryKey, Dict[str, int]] = defaultdict(lambda: {"present": 0, "absent": 0, "late": 0})
+    for record in records:
+        key = (record["scan_date"], record["grade_id"], record["class_id"])
+        if record["status"] == "A":
+            counts[key]["absent"] += 1
+        else:
+            counts[key]["present"] += 1
+            if is_late(record):
+                counts[key]["late"] += 1
+
+    now = datetime.utcnow()
+    return [
+        UpdateOne(
+            {"scan_date": scan_date, "grade_id": grade_id, "class_id": class_id},
+            {"$inc": increments, "$set": {"updated_at": now}},
+            upsert=True
+        )
+        for (scan_date, grade_id, class_id), increments in counts.items()
+    ]
+
+# Count newly written attendance into the daily summaries. The attendance
+# rows are already stored, so a failure here is reported, not raised;
+# rebuild_daily_summaries repairs the day.
+async def record_scans(records: List[dict]):
+    updates = _summary_updates(records)
+    if not updates:
+        return
+    try:
+        await async_attendance_daily_summaries.bulk_write(updates, ordered=False)
+    except PyMongoError as e:
+        print(f"❌ Attendance summary update failed: {e}")
+
+def record_absences(records: List[dict]):
+    updates = _summary_updates(records)
+    if not updates:
+        return
+    try:
+        attendance_daily_summaries.bulk_write(updates, ordered=False)
+    except PyMongoError as e:
+        print(f"❌ Attendance summary update failed: {e}")
+
+# Recompute one day's summaries from the raw attendance rows
+async def rebuild_daily_summaries(scan_date: date) -> int:
+    day = str(scan_date)
+    pipeline = [
+        {"$match": {"scan_date": day, "deleted_at": None}},
+        {"$group": {
+            "_id": {"grade_id": "$grade_id", "class_id": "$class_id"},
+            "present": {"$sum": {"$cond": [{"$eq": ["$status", "A"]}, 0, 1]}},
+            "absent": {"$sum": {"$cond": [{"$eq": ["$status", "A"]}, 1, 0]}},
+            "late": {"$sum": {"$cond": [
+                {"$and": [{"$eq": ["$status", "P"]}, {"$gt": ["$time", LATE_AFTER]}]}, 1, 0
+            ]}},
+        }},
+        {"$project": {
+            "_id": 0,
+            "scan_date": day,
+            "grade_id": "$_id.grade_id",
+            "class_id": "$_id.class_id",
+            "present": 1,
+            "absent": 1,
+            "late": 1,
+            "updated_at": "$$NOW",
+        }},
+    ]
+    rows = await async_attendance.aggregate(pipeline).to_list(None)
+
+    # Replace each key in place, so concurrent $inc upserts from record_scans
+    # never hit a missing or duplicate summary
+    if rows:
+        await async_attendance_daily_summaries.bulk_write([
+            ReplaceOne({"scan_date": day, "grade_id": row["grade_id"], "class_id": row["class_id"]}, row, upsert=True)
+            for row in rows
+        ], ordered=False)
+
+    # Then drop only the keys that no longer have any attendance
+    stale = {"scan_date": day}
+    if rows:
+        stale["$nor"] = [{"grade_id": row["grade_id"], "class_id": row["class_id"]} for row in rows]
+    await async_attendance_daily_summaries.delete_many(stale)
+    return len(rows)
+
+def _summary_response(doc: dict) -> AttendanceDailySummarySchema:
+    return AttendanceDailySummarySchema(
+        scan_date=doc["scan_date"],
+        grade_id=doc["grade_id"],
+        class_id=doc["class_id"],
+        present=doc.get("present", 0),
+        absent=doc.get("absent", 0),
+        late=doc.get("late", 0),
+        updated_at=doc.get("updated_at")
+    )
+
+# Per-class summaries for a day
+async def get_daily_summaries(scan_date: date, grade_id: Optional[str] = None, class_id: Optional[str] = None) -> List[AttendanceDailySummarySchema]:
+    query = {"scan_date": str(scan_date)}
+    if grade_id:
+        query["grade_id"] = grade_id
+    if class_id:
+        query["class_id"] = class_id
+
+    docs = await async_attendance_daily_summaries.find(query, {"_id": 0}).sort([("grade_id", 1), ("class_id", 1)]).to_list(None)
+    return [_summary_response(doc) for doc in docs]
+
+# Per-grade totals for a day, rolled up from the per-class summaries
+async def get_grade_summaries(scan_date: date) -> List[AttendanceGradeSummarySchema]:
+    pipeline = [
+        {"$match": {"scan_date": str(scan_date)}},
+        {"$group": {
+            "_id": "$grade_id",
+            "present": {"$sum": "$present"},
+            "absent": {"$sum": "$absent"},
+            "late": {"$sum": "$late"},
+            "classes": {"$sum": 1},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    rows = await async_attendance_daily_summaries.aggregate(pipeline).to_list(None)
+    return [
+        AttendanceGradeSummarySchema(
+            scan_date=scan_date,
+            grade_id=row["_id"],
+            present=row["present"],
+            absent=row["absent"],
+            late=row["late"],
+            classes=row["classes"]
+        )
+        for row in rows
+    ]
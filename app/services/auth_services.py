@@ -1,15 +1,29 @@
 from fastapi import HTTPException
-from app.database.database import admins
+from datetime import datetime
+from app.database.database import async_admins
 from app.schemas.auth_schema import LoginSchema, TokenResponseSchema, AdminResponseSchema
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.utils.security import create_access_token
+from app.utils.password_hasher import verify_and_update_password, ip_limiter, email_limiter
 from bson import ObjectId
 
-def authenticate_admin(login_data: LoginSchema) -> TokenResponseSchema:
-    # Validate email and password
-    admin = admins.find_one({"email": login_data.email, "deleted_at": None})
-    
-    if not admin or not verify_password(login_data.password, admin["password"]):
-        raise HTTPException(status_code=401, detail="Invalid email or password")
+async def authenticate_admin(login_data: LoginSchema, client_ip: str) -> TokenResponseSchema:
+    with ip_limiter.hold(client_ip), email_limiter.hold(login_data.email.lower()):
+        # Validate email and password
+        admin = await async_admins.find_one({"email": login_data.email, "deleted_at": None})
+        
+        if not admin:
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+
+        verified, new_hash = await verify_and_update_password(login_data.password, admin["password"])
+        if not verified:
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Transparently move the stored hash to the configured bcrypt cost
+    if new_hash:
+        await async_admins.update_one(
+            {"_id": admin["_id"]},
+            {"$set": {"password": new_hash, "updated_at": datetime.utcnow()}}
+        )
 
     # Generate JWT token
     access_token = create_access_token({"sub": str(admin["_id"])}, expires_delta=None)
@@ -3,8 +3,11 @@ from app.database.database import classes
 from pymongo.errors import DuplicateKeyError, PyMongoError
 from app.schemas.class_schema import classCreateSchema, ClassUpdateSchema, ClassResponseSchema
 from bson import ObjectId, errors
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+from app.models.api_response import CursorPage
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, after_cursor, decode_cursor, projection_for, project_document, split_page
+from app.utils.reference_cache import reference_cache
 
 def create_class(cls: classCreateSchema) -> ClassResponseSchema:
     try:
@@ -33,6 +36,7 @@ def create_class(cls: classCreateSchema) -> ClassResponseSchema:
         # Convert ObjectId to string for response
         class_data["id"] = str(result.inserted_id)
         class_data["grade_id"] = str(class_data["grade_id"])
+        reference_cache.invalidate_class(class_data["id"])
 
         return ClassResponseSchema(**class_data)
 
@@ -46,13 +50,19 @@ def create_class(cls: classCreateSchema) -> ClassResponseSchema:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
     
 # get all classes
-def get_all_classes() -> List[ClassResponseSchema]:
+def get_all_classes(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT, fields: Optional[List[str]] = None) -> CursorPage:
     try:
-        class_list = list(classes.find({"deleted_at": None}))  
+        query = after_cursor({"deleted_at": None}, cursor)
+        class_list = list(classes.find(query, projection_for(fields)).sort("_id", 1).limit(limit + 1))
 
-        if not class_list:
+        if not class_list and not cursor:
             raise HTTPException(status_code=404, detail="No classes found.")
 
+        class_list, next_cursor = split_page(class_list, limit)
+
+        if fields is not None:
+            return CursorPage(items=[project_document(cls, fields) for cls in class_list], limit=limit, next_cursor=next_cursor)
+
         for cls in class_list:
             cls["id"] = str(cls["_id"])  # Convert ObjectId to string
             del cls["_id"]
@@ -65,11 +75,14 @@ def get_all_classes() -> List[ClassResponseSchema]:
             if "description" not in cls:
                 cls["description"] = f"Class {cls['section_name']} for grade {cls['grade_id']}"
 
-        return [ClassResponseSchema(**cls) for cls in class_list]
+        return CursorPage(items=[ClassResponseSchema(**cls) for cls in class_list], limit=limit, next_cursor=next_cursor)
 
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    except HTTPException as e:
+        raise e
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
@@ -92,28 +105,42 @@ def get_class_by_id(class_id: str) -> ClassResponseSchema:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 # get class by grade
-def get_classes_by_grade(grade_id: str) -> List[ClassResponseSchema]:
+def get_classes_by_grade(grade_id: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT, fields: Optional[List[str]] = None) -> CursorPage:
     try:
         # Validate grade_id
         if not ObjectId.is_valid(grade_id):
             raise HTTPException(status_code=400, detail="Invalid grade ID.")
 
-        # Find all classes for the given grade_id
-        class_list = list(classes.find({"grade_id": ObjectId(grade_id), "deleted_at": None}))
+        # Classes of a grade come from the reference cache, sorted by _id,
+        # so the keyset page is cut in memory
+        class_list = reference_cache.get_classes_by_grade(grade_id)
+        if cursor:
+            after_id = decode_cursor(cursor)
+            class_list = [cls for cls in class_list if cls["_id"] > after_id]
+        class_list = [dict(cls) for cls in class_list[:limit + 1]]
 
-        if not class_list:
+        if not class_list and not cursor:
             raise HTTPException(status_code=404, detail="No classes found for this grade.")
 
+        class_list, next_cursor = split_page(class_list, limit)
+
+        if fields is not None:
+            return CursorPage(items=[project_document(cls, fields) for cls in class_list], limit=limit, next_cursor=next_cursor)
+
         # Convert MongoDB documents to Pydantic models
         for cls in class_list:
             cls["id"] = str(cls["_id"])  # Convert ObjectId to string
             del cls["_id"]  # Remove the MongoDB _id field
+            cls["grade_id"] = str(cls["grade_id"])
 
-        return [ClassResponseSchema(**cls) for cls in class_list]
+        return CursorPage(items=[ClassResponseSchema(**cls) for cls in class_list], limit=limit, next_cursor=next_cursor)
 
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    except HTTPException as e:
+        raise e
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
     
@@ -132,6 +159,7 @@ def update_class(class_id: str, cls: ClassUpdateSchema) -> ClassResponseSchema:
         )
         
         if result.matched_count:
+            reference_cache.invalidate_class(class_id)
             return get_class_by_id(class_id)
         else:
             raise HTTPException(status_code=404, detail="Class not found or no changes made.")
@@ -161,6 +189,8 @@ def soft_delete_class(class_id: str):
         if result.modified_count == 0:
             raise HTTPException(status_code=400, detail="Failed to delete class")
 
+        reference_cache.invalidate_class(class_id)
+
         return {"message": "Class deleted successfully"}
 
     except PyMongoError as e:
@@ -3,44 +3,89 @@ from pymongo.errors import DuplicateKeyError, PyMongoError
 from app.database.database import student_class_assignments, classes, grades,students
 from bson import ObjectId
 from datetime import datetime
-from typing import List, Union, Optional
-from app.schemas.student_schema import StudentResponseSchema
-from app.schemas.student_class_assign_schema import StudentClassAssignmentCreateSchema, StudentClassAssignmentResponseSchema, StudentClassAssignmentUpdateSchema
+from typing import Dict, Iterator, List, Union, Optional
+from app.schemas.student_schema import StudentResponseSchema, StudentWithClassResponseSchema
+from app.schemas.student_class_assign_schema import StudentClassAssignmentCreateSchema, StudentClassAssignmentResponseSchema, StudentClassAssignmentUpdateSchema, StudentFilterResponseSchema
+from app.models.api_response import PaginatedData
+from app.utils.reference_cache import reference_cache
+
+# Assignment references may be stored as ObjectId or as string
+def _reference_match(value: str):
+    return {"$in": [ObjectId(value), value]} if ObjectId.is_valid(value) else value
+
+def _to_object_id(expression):
+    return {"$convert": {"input": expression, "to": "objectId", "onError": None, "onNull": None}}
+
+def _join_stage(collection_name: str, local_field: str, projection: dict, as_field: str) -> dict:
+    return {"$lookup": {
+        "from": collection_name,
+        "let": {"ref": _to_object_id(local_field)},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$_id", "$$ref"]}}},
+            {"$project": projection},
+        ],
+        "as": as_field,
+    }}
 
 # retrieve students based on grade, class, and year.
-def filter_students(grade_id: Optional[str] = None, class_id: Optional[str] = None, academic_year: Optional[int] = None):
+def filter_students(
+    grade_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    academic_year: Optional[int] = None,
+    page: int = 1,
+    limit: int = 50
+) -> PaginatedData[StudentFilterResponseSchema]:
     try:
         # Build the query based on provided filters
-        query = {}
+        query = {"deleted_at": None}
         if grade_id:
-            query["grade_id"] = grade_id
+            query["grade_id"] = _reference_match(grade_id)
         if class_id:
-            query["class_id"] = class_id
+            query["class_id"] = _reference_match(class_id)
         if academic_year:
             query["academic_year"] = academic_year
 
-        # Retrieve assignments matching the query
-        assignments = list(student_class_assignments.find(query))
-
-        # Join data from students, grades, and classes collections
-        result = []
-        for assignment in assignments:
-            student = students.find_one({"_id": ObjectId(assignment["student_id"])})
-            grade = grades.find_one({"_id": ObjectId(assignment["grade_id"])})
-            class_info = classes.find_one({"_id": ObjectId(assignment["class_id"])})
-            if student and grade and class_info:
-                result.append({
-                    "student_id": str(student["_id"]),
-                    "student_name": student["name"],
-                    "student_index_number":student["index_number"],
-                    "grade_id": str(grade["_id"]),
-                    "grade_level": grade["grade_level"],
-                    "class_id": str(class_info["_id"]),
-                    "class_name": class_info["section_name"],
-                    "academic_year": assignment["academic_year"]
-                })
-
-        return result
+        # One aggregation: join students, grades and classes server-side, drop
+        # assignments whose references are missing, then count and page. Joining
+        # before the $facet keeps `total` and `items` counting the same rows.
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"_id": 1}},
+            _join_stage(students.name, "$student_id", {"name": 1, "index_number": 1}, "student"),
+            _join_stage(grades.name, "$grade_id", {"grade_level": 1}, "grade"),
+            _join_stage(classes.name, "$class_id", {"section_name": 1}, "class_info"),
+            {"$unwind": "$student"},
+            {"$unwind": "$grade"},
+            {"$unwind": "$class_info"},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "items": [
+                    {"$skip": (page - 1) * limit},
+                    {"$limit": limit},
+                    {"$project": {
+                        "_id": 0,
+                        "student_id": {"$toString": "$student._id"},
+                        "student_name": "$student.name",
+                        "student_index_number": "$student.index_number",
+                        "grade_id": {"$toString": "$grade._id"},
+                        "grade_level": "$grade.grade_level",
+                        "class_id": {"$toString": "$class_info._id"},
+                        "class_name": "$class_info.section_name",
+                        "academic_year": 1,
+                    }},
+                ],
+            }},
+        ]
+
+        result = next(student_class_assignments.aggregate(pipeline))
+        total = result["total"][0]["count"] if result["total"] else 0
+
+        return PaginatedData[StudentFilterResponseSchema](
+            items=[StudentFilterResponseSchema(**item) for item in result["items"]],
+            total=total,
+            page=page,
+            limit=limit
+        )
 
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -48,43 +93,49 @@ def filter_students(grade_id: Optional[str] = None, class_id: Optional[str] = No
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
     
-# retrieve a student's class and grade details by their index number.
-def get_all_students_with_class_details():
+# Latest (highest academic_year) live assignment per student, keyed by student id
+def _latest_assignments() -> Dict[str, dict]:
+    pipeline = [
+        {"$match": {"deleted_at": None}},
+        {"$sort": {"student_id": 1, "academic_year": -1}},
+        {"$group": {
+            "_id": "$student_id",
+            "grade_id": {"$first": "$grade_id"},
+            "class_id": {"$first": "$class_id"},
+            "academic_year": {"$first": "$academic_year"},
+        }},
+    ]
+    return {
+        str(assignment["_id"]): assignment
+        for assignment in student_class_assignments.aggregate(pipeline, allowDiskUse=True)
+    }
+
+# stream every active student with the grade and class of their latest assignment
+def iter_students_with_class_details() -> Iterator[StudentWithClassResponseSchema]:
+    latest_assignments = _latest_assignments()
+
+    for student in students.find({"status": True, "deleted_at": None}, batch_size=1000):
+        student_id_str = str(student["_id"])
+        assignment = latest_assignments.get(student_id_str)
+
+        if assignment:
+            grade = reference_cache.get_grade(str(assignment["grade_id"]))
+            class_info = reference_cache.get_class(str(assignment["class_id"]))
+
+            student["grade_level"] = grade["grade_level"] if grade else None
+            student["class_name"] = class_info["section_name"] if class_info else None
+            student["academic_year"] = assignment["academic_year"]
+
+        student["id"] = student_id_str
+        yield StudentWithClassResponseSchema(**student)
+
+# retrieve every active student's class and grade details.
+def get_all_students_with_class_details() -> List[StudentWithClassResponseSchema]:
     try:
-        # Fetch all active students
-        students_data = students.find({"status": True, "deleted_at": None})
-        
-        all_students = []
-        for student in students_data:
-            student_id_str = str(student["_id"])
-
-            # Find the latest class assignment
-            assignment = student_class_assignments.find_one(
-                {"student_id": student_id_str, "deleted_at": None},
-                sort=[("academic_year", -1)]  # Get the latest assignment
-            )
-
-            # If the student has an assignment, get grade and class details
-            if assignment:
-                grade = grades.find_one({"_id": ObjectId(assignment["grade_id"])})
-                class_info = classes.find_one({"_id": ObjectId(assignment["class_id"])})
-
-                student["grade_level"] = grade["grade_level"] if grade else None
-                student["class_name"] = class_info["section_name"] if class_info else None
-                student["academic_year"] = assignment["academic_year"]
-            else:
-                student["grade_level"] = None
-                student["class_name"] = None
-                student["academic_year"] = None
-
-            # Convert ObjectId to string
-            student["id"] = student_id_str
-            all_students.append(StudentResponseSchema(**student))
-
-        return all_students
+        return list(iter_students_with_class_details())
 
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
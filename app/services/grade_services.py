@@ -2,9 +2,12 @@ from fastapi import HTTPException
 from pymongo.errors import DuplicateKeyError, PyMongoError
 from app.schemas.grade_schema import GradeCreateSchema, GradeUpdateSchema, GradeResponseSchema
 from app.database.database import grades
+from app.utils.reference_cache import reference_cache
 from bson import ObjectId
-from typing import List, Union
+from typing import List, Optional, Union
 from datetime import datetime, date
+from app.models.api_response import CursorPage
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, after_cursor, projection_for, project_document, split_page
 
 # create grade 
 def create_grade(grade: GradeCreateSchema) -> GradeResponseSchema:
@@ -23,6 +26,7 @@ def create_grade(grade: GradeCreateSchema) -> GradeResponseSchema:
         # Insert the new grade into MongoDB
         result = grades.insert_one(grade_data)
         grade_data["id"] = str(result.inserted_id)  # Convert ObjectId to string
+        reference_cache.invalidate_grade(grade_data["id"])
 
         # Return response
         return GradeResponseSchema(**grade_data)
@@ -37,22 +41,31 @@ def create_grade(grade: GradeCreateSchema) -> GradeResponseSchema:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 # get all grade
-def get_all_grade() -> GradeResponseSchema:
+def get_all_grade(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT, fields: Optional[List[str]] = None) -> CursorPage:
     try:
-        grade_list = list(grades.find({"deleted_at": None}))  
+        query = after_cursor({"deleted_at": None}, cursor)
+        grade_list = list(grades.find(query, projection_for(fields)).sort("_id", 1).limit(limit + 1))
       
-        if not grade_list:
+        if not grade_list and not cursor:
             raise HTTPException(status_code=404, detail="No grades found.")
 
+        grade_list, next_cursor = split_page(grade_list, limit)
+
+        if fields is not None:
+            return CursorPage(items=[project_document(grade, fields) for grade in grade_list], limit=limit, next_cursor=next_cursor)
+
         for grade in grade_list:
             grade["id"] = str(grade["_id"]) 
             del grade["_id"]  
 
-        return [GradeResponseSchema(**grade) for grade in grade_list]
+        return CursorPage(items=[GradeResponseSchema(**grade) for grade in grade_list], limit=limit, next_cursor=next_cursor)
 
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    except HTTPException as e:
+        raise e
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
@@ -83,6 +96,7 @@ def update_grade(grade_id: str, grade: GradeUpdateSchema) -> GradeResponseSchema
         )
         
         if result.matched_count:
+            reference_cache.invalidate_grade(grade_id)
             return get_grade_by_id(grade_id)
     
         else:
@@ -112,6 +126,8 @@ def soft_delete_grade(grade_id: str):
         if result.modified_count == 0:
             raise HTTPException(status_code=400, detail="Failed to delete grade")
 
+        reference_cache.invalidate_grade(grade_id)
+
         return {"message": "Grade deleted successfully"}
 
     except PyMongoError as e:
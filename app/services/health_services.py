@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Dict, Tuple
+from pymongo.errors import PyMongoError
+from app.database.database import ping
+from app.sheduler.mark_absent_sheduler import scheduler, MARK_ABSENT_JOB
+from app.utils.reference_cache import reference_cache
+from app.utils.metrics import sync_pool_listener, async_pool_listener, metrics, EventLoopLagMonitor
+from app.config.config import HEALTH_PING_CACHE_SECONDS, HEALTH_PING_TIMEOUT_SECONDS, SCHEDULER_ENABLED
+
+loop_lag_monitor = EventLoopLagMonitor()
+
+
+class CachedPing:
+    """
+    Mongo ping shared by concurrent readiness probes and reused for
+    `ttl_seconds`, so a busy load balancer costs at most one ping per window.
+    """
+
+    def __init__(self, ttl_seconds: float = HEALTH_PING_CACHE_SECONDS, timeout_seconds: float = HEALTH_PING_TIMEOUT_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.ok = False
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> bool:
+        if time.monotonic() - self.checked_at < self.ttl_seconds:
+            return self.ok
+        async with self._lock:
+            if time.monotonic() - self.checked_at >= self.ttl_seconds:
+                try:
+                    self.ok = await asyncio.wait_for(ping(), self.timeout_seconds)
+                except asyncio.TimeoutError:
+                    self.ok = False
+                self.checked_at = time.monotonic()
+        return self.ok
+
+
+mongo_ping = CachedPing()
+
+def _scheduler_state() -> str:
+    if not SCHEDULER_ENABLED:
+        return "disabled"
+    if scheduler.running and scheduler.get_job(MARK_ABSENT_JOB) is not None:
+        return "running"
+    return "stopped"
+
+async def check_readiness() -> Tuple[bool, Dict[str, str]]:
+    mongo_ok = await mongo_ping.check()
+
+    # Retry a warm-up that failed at startup once Mongo is reachable
+    if mongo_ok and not reference_cache.warmed:
+        try:
+            await reference_cache.warm()
+        except PyMongoError:
+            pass
+
+    checks = {
+        "mongo": "ok" if mongo_ok else "unreachable",
+        "scheduler": _scheduler_state(),
+        "reference_cache": "warm" if reference_cache.warmed else "cold",
+    }
+    ready = mongo_ok and checks["scheduler"] != "stopped" and reference_cache.warmed
+    return ready, checks
+
+def runtime_stats() -> dict:
+    return {
+        "in_flight_requests": metrics.in_flight,
+        "event_loop_lag": loop_lag_monitor.snapshot(),
+        "mongo_pools": {
+            "sync": sync_pool_listener.stats.snapshot(),
+            "async": async_pool_listener.stats.snapshot(),
+        },
+    }
@@ -0,0 +1,214 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from app.database.database import async_student_class_assignments, async_students, async_job_runs
+from app.schemas.student_class_assign_schema import PromotionRequestSchema, PromotionMappingSchema, PromotionResultSchema, PromotionMappingResultSchema
+from app.services.attendance_roll_services import roll_sheet_cache
+from app.sheduler.job_lease import OWNER_ID, job_lease
+from app.utils.reference_cache import reference_cache
+from app.config.config import PROMOTION_CHUNK_SIZE
+
+PROMOTE_STUDENTS_JOB = "promote_students"
+
+def _object_id(value: str) -> ObjectId:
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=400, detail=f"Invalid ObjectId: {value}")
+    return ObjectId(value)
+
+# Every class must exist and belong to the grade it is mapped with
+async def _validate_mappings(mappings: List[PromotionMappingSchema]):
+    seen = set()
+    for mapping in mappings:
+        if mapping.from_class_id in seen:
+            raise HTTPException(status_code=400, detail=f"Class {mapping.from_class_id} is mapped more than once")
+        seen.add(mapping.from_class_id)
+
+        for grade_id, class_id in ((mapping.from_grade_id, mapping.from_class_id), (mapping.to_grade_id, mapping.to_class_id)):
+            _object_id(grade_id)
+            class_doc = await reference_cache.get_class_async(str(_object_id(class_id)))
+            if class_doc is None:
+                raise HTTPException(status_code=404, detail=f"Class {class_id} not found")
+            if str(class_doc["grade_id"]) != grade_id:
+                raise HTTPException(status_code=400, detail=f"Class {class_id} does not belong to grade {grade_id}")
+
+def _promotion_pipeline(mappings: List[PromotionMappingSchema], from_year: int, to_year: int) -> list:
+    """
+    One row per active student in a mapped class for `from_year`, carrying
+    the target grade/class and whether a `to_year` assignment already exists.
+    """
+    branches = [
+        {
+            "case": {"$and": [
+                {"$eq": ["$grade_id", ObjectId(mapping.from_grade_id)]},
+                {"$eq": ["$class_id", ObjectId(mapping.from_class_id)]},
+            ]},
+            "then": {"grade_id": ObjectId(mapping.to_grade_id), "class_id": ObjectId(mapping.to_class_id)},
+        }
+        for mapping in mappings
+    ]
+    return [
+        {"$match": {
+            "academic_year": from_year,
+            "deleted_at": None,
+            "class_id": {"$in": [ObjectId(mapping.from_class_id) for mapping in mappings]},
+        }},
+        {"$lookup": {
+            "from": async_students.name,
+            "localField": "student_id",
+            "foreignField": "_id",
+            "pipeline": [
+                {"$match": {"status": True, "deleted_at": None}},
+                {"$project": {"_id": 1}},
+            ],
+            "as": "student",
+        }},
+        {"$match": {"student": {"$ne": []}}},
+        {"$lookup": {
+            "from": async_student_class_assignments.name,
+            "localField": "student_id",
+            "foreignField": "student_id",
+            "pipeline": [
+                {"$match": {"academic_year": to_year, "deleted_at": None}},
+                {"$project": {"_id": 1}},
+                {"$limit": 1},
+            ],
+            "as": "existing",
+        }},
+        {"$project": {
+            "_id": 0,
+            "student_id": 1,
+            "from_class_id": "$class_id",
+            "target": {"$switch": {"branches": branches, "default": None}},
+            "already_assigned": {"$gt": [{"$size": "$existing"}, 0]},
+        }},
+        {"$match": {"target": {"$ne": None}}},
+    ]
+
+def _upsert(row: dict, to_year: int, now: datetime) -> UpdateOne:
+    # Keyed on (student, year) and insert-only, so re-running never duplicates or overwrites
+    return UpdateOne(
+        {"student_id": row["student_id"], "academic_year": to_year, "deleted_at": None},
+        {"$setOnInsert": {
+            "grade_id": row["target"]["grade_id"],
+            "class_id": row["target"]["class_id"],
+            "created_at": now,
+            "updated_at": None,
+        }},
+        upsert=True
+    )
+
+async def _write_chunk(operations: List[Tuple[str, UpdateOne]], counts: Dict[str, Dict[str, int]]):
+    try:
+        result = await async_student_class_assignments.bulk_write([operation for _, operation in operations], ordered=False)
+        upserted = result.upserted_ids or {}
+    except BulkWriteError as e:
+        # A duplicate key on the unique (student, year) index means another
+        # writer assigned the student between our match and the insert
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+        upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+    # Upserted operations are reported by their index in the batch; the rest
+    # matched an assignment written since the aggregation read it
+    for index, (from_class_id, _) in enumerate(operations):
+        counts[from_class_id]["promoted" if index in upserted else "already_assigned"] += 1
+
+async def promote_students(request: PromotionRequestSchema) -> PromotionResultSchema:
+    """
+    Assign every active student of each mapped class to its target class for
+    the next academic year. Resumable rather than transactional: rows are
+    insert-only upserts, so a rerun after a failure skips what is done.
+    """
+    started = time.perf_counter()
+    from_year = request.from_academic_year
+    to_year = from_year + 1
+    await _validate_mappings(request.mappings)
+
+    async with job_lease(PROMOTE_STUDENTS_JOB) as acquired:
+        if not acquired:
+            raise HTTPException(status_code=409, detail="A promotion is already running")
+
+        run_id = (await async_job_runs.insert_one({
+            "job": PROMOTE_STUDENTS_JOB,
+            "trigger": "dry_run" if request.dry_run else "manual",
+            "owner": OWNER_ID,
+            "status": "running",
+            "started_at": datetime.utcnow(),
+            "finished_at": None,
+            "from_academic_year": from_year,
+            "to_academic_year": to_year,
+            "progress": {"processed": 0, "promoted": 0, "already_assigned": 0},
+            "error": None
+        })).inserted_id
+
+        counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"candidates": 0, "promoted": 0, "already_assigned": 0})
+        processed = 0
+        now = datetime.utcnow()
+
+        async def report_progress():
+            progress = {
+                "processed": processed,
+                "promoted": sum(c["promoted"] for c in counts.values()),
+                "already_assigned": sum(c["already_assigned"] for c in counts.values()),
+            }
+            await async_job_runs.update_one({"_id": run_id}, {"$set": {"progress": progress}})
+
+        try:
+            chunk: List[Tuple[str, UpdateOne]] = []
+            async for row in async_student_class_assignments.aggregate(_promotion_pipeline(request.mappings, from_year, to_year), allowDiskUse=True):
+                from_class_id = str(row["from_class_id"])
+                counts[from_class_id]["candidates"] += 1
+                processed += 1
+                if row["already_assigned"]:
+                    counts[from_class_id]["already_assigned"] += 1
+                elif request.dry_run:
+                    counts[from_class_id]["promoted"] += 1
+                else:
+                    chunk.append((from_class_id, _upsert(row, to_year, now)))
+
+                if len(chunk) >= PROMOTION_CHUNK_SIZE:
+                    await _write_chunk(chunk, counts)
+                    chunk = []
+                    await report_progress()
+
+            if chunk:
+                await _write_chunk(chunk, counts)
+            await report_progress()
+        except Exception as e:
+            # Any failure ends the run, so job_runs never keeps a stale "running" entry
+            await async_job_runs.update_one({"_id": run_id}, {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}})
+            if isinstance(e, PyMongoError):
+                raise HTTPException(status_code=500, detail=f"Promotion stopped, run it again to resume: {str(e)}")
+            raise
+
+        if not request.dry_run:
+            roll_sheet_cache.clear()
+
+        result = PromotionResultSchema(
+            run_id=str(run_id),
+            dry_run=request.dry_run,
+            from_academic_year=from_year,
+            to_academic_year=to_year,
+            candidates=processed,
+            promoted=sum(c["promoted"] for c in counts.values()),
+            already_assigned=sum(c["already_assigned"] for c in counts.values()),
+            mappings=[
+                PromotionMappingResultSchema(
+                    from_class_id=mapping.from_class_id,
+                    to_class_id=mapping.to_class_id,
+                    **counts.get(mapping.from_class_id, {"candidates": 0, "promoted": 0, "already_assigned": 0})
+                )
+                for mapping in request.mappings
+            ],
+            elapsed_seconds=round(time.perf_counter() - started, 3)
+        )
+        await async_job_runs.update_one({"_id": run_id}, {"$set": {
+            "status": "succeeded",
+            "finished_at": datetime.utcnow(),
+            "result": result.model_dump(exclude={"mappings"})
+        }})
+        return result
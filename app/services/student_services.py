@@ -1,15 +1,24 @@
-from app.database.database import students
-from app.schemas.student_schema import StudentCreateSchema, StudentResponseSchema, StudentUpdateSchema
+import asyncio
+import csv
+import json
+from app.database.database import async_students as students
+from app.schemas.student_schema import StudentCreateSchema, StudentResponseSchema, StudentUpdateSchema, StudentImportResultSchema, StudentImportRowErrorSchema
+from app.services.attendance_roll_services import roll_sheet_cache
+from app.config.config import STUDENT_IMPORT_CHUNK_SIZE
 from bson import ObjectId
 from fastapi import HTTPException
-from typing import List, Union
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple, Union
+from pydantic import ValidationError
 from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime, date
+from app.models.api_response import CursorPage
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, after_cursor, projection_for, project_document, split_page
 
 # create student function
-def create_student(student: StudentCreateSchema) -> StudentResponseSchema:
+async def create_student(student: StudentCreateSchema) -> StudentResponseSchema:
     
-    existing_student_index = students.find_one({"index_number": student.index_number})
+    existing_student_index = await students.find_one({"index_number": student.index_number})
     
     if existing_student_index:
         raise HTTPException(status_code=400, detail="Index number already exists. Please use a different index number.")
@@ -21,30 +30,35 @@ def create_student(student: StudentCreateSchema) -> StudentResponseSchema:
         
     student_data["deleted_at"] = None  # Soft delete handling
     
-    result = students.insert_one(student_data)
+    result = await students.insert_one(student_data)
     
     student_data["id"] = str(result.inserted_id)
     
     return StudentResponseSchema(**student_data)
 
 # get all student
-def get_all_students() -> StudentResponseSchema:
-    student_list = students.find({"status": True, "deleted_at": None}).to_list(None)
+async def get_all_students(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT, fields: Optional[List[str]] = None) -> CursorPage:
+    query = after_cursor({"status": True, "deleted_at": None}, cursor)
+    student_list = await students.find(query, projection_for(fields)).sort("_id", 1).limit(limit + 1).to_list(None)
     
-    if not student_list:
+    if not student_list and not cursor:
         raise HTTPException(status_code=404, detail="No students found.")
     
-    response_data = []
+    student_list, next_cursor = split_page(student_list, limit)
+    
+    if fields is not None:
+        return CursorPage(items=[project_document(student, fields) for student in student_list], limit=limit, next_cursor=next_cursor)
+    
     for student in student_list:
         student["id"] = str(student["_id"]) 
         del student["_id"]
         
     response_data = [StudentResponseSchema(**student) for student in student_list]
-    return response_data
+    return CursorPage(items=response_data, limit=limit, next_cursor=next_cursor)
 
 # get student by id
-def get_student_by_id(student_id: str) -> StudentResponseSchema:
-    student = students.find_one({"_id":ObjectId(student_id), "status": True, "deleted_at": None})
+async def get_student_by_id(student_id: str) -> StudentResponseSchema:
+    student = await students.find_one({"_id":ObjectId(student_id), "status": True, "deleted_at": None})
     
     if not student :
         raise HTTPException(status_code=404, detail="Student not found")
@@ -53,8 +67,8 @@ def get_student_by_id(student_id: str) -> StudentResponseSchema:
     return StudentResponseSchema(**student)
 
 # get student by index number
-def get_student_by_index_number(index_number: str) -> StudentResponseSchema:
-    student = students.find_one({"index_number": index_number, "status": True, "deleted_at": None})
+async def get_student_by_index_number(index_number: str) -> StudentResponseSchema:
+    student = await students.find_one({"index_number": index_number, "status": True, "deleted_at": None})
     
     if not student :
         raise HTTPException(status_code=404, detail="Student not found")
@@ -63,7 +77,7 @@ def get_student_by_index_number(index_number: str) -> StudentResponseSchema:
     return StudentResponseSchema(**student)
 
 # student update
-def update_student(student_id : str, student : StudentUpdateSchema) -> StudentResponseSchema :
+async def update_student(student_id : str, student : StudentUpdateSchema) -> StudentResponseSchema :
     update_data = {k: v for k, v in student.dict().items() if v is not None}
     
     if "dob" in update_data and isinstance(update_data["dob"], date):
@@ -71,38 +85,41 @@ def update_student(student_id : str, student : StudentUpdateSchema) -> StudentRe
         
     update_data["updated_at"] = datetime.utcnow()
     
-    result = students.update_one(
+    result = await students.update_one(
         {"_id": ObjectId(student_id), "status": True, "deleted_at": None},
         {"$set": update_data}
     )
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Student not found or inactive")
-    
-    return get_student_by_id(student_id)
+
+    # Roll sheets show student names and index numbers
+    roll_sheet_cache.clear()
+    return await get_student_by_id(student_id)
 
 # student soft delete
-def soft_delete_student(student_id : str):
-    student = students.find_one({"_id": ObjectId(student_id), "deleted_at": None})
+async def soft_delete_student(student_id : str):
+    student = await students.find_one({"_id": ObjectId(student_id), "deleted_at": None})
     
     if not student:
         raise HTTPException(status_code=404, detail="Student not found or already deleted")
     
-    result = students.update_one(
+    result = await students.update_one(
         {"_id": ObjectId(student_id)}, 
         {"$set": {"deleted_at": datetime.utcnow()}}  # Mark the student as deleted
     )
     
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Failed to delete student")
-    
+
+    roll_sheet_cache.clear()
     return {"message": "Student deleted successfully"}
     
 # Change the status of either a single or multiple students to 
-def change_students_status(student_ids: Union[str, List[str]]) -> dict:
+async def change_students_status(student_ids: Union[str, List[str]]) -> dict:
     if isinstance(student_ids, str):
         # Single student ID, update status to False
-        result = students.update_one(
+        result = await students.update_one(
             {"_id": ObjectId(student_ids), "deleted_at": None},
             {"$set": {"status": False}}
         )
@@ -111,6 +128,7 @@ def change_students_status(student_ids: Union[str, List[str]]) -> dict:
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Student not found or already inactive")
 
+        roll_sheet_cache.clear()
         return {"message": "Student status changed to False successfully"}
 
     elif isinstance(student_ids, list):
@@ -121,12 +139,13 @@ def change_students_status(student_ids: Union[str, List[str]]) -> dict:
         ]
         
         # Perform the batch update (bulk_write)
-        result = students.bulk_write(update_operations)
+        result = await students.bulk_write(update_operations)
 
         # If no students were modified, return an error
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="No students found or already inactive")
 
+        roll_sheet_cache.clear()
         return {"message": f"{result.modified_count} students' status changed to inactive successfully"}
 
     else:
@@ -135,4 +154,140 @@ def change_students_status(student_ids: Union[str, List[str]]) -> dict:
 
 
       
-    
\ No newline at end of file
+    
+
+# Bulk import
+GUARDIAN_COLUMNS = {
+    "guardian_name": "name",
+    "guardian_relationship": "relationship",
+    "guardian_contact_number": "contact_number",
+    "guardian_email": "guardian_email",
+}
+
+def _csv_row_to_student(row: dict) -> dict:
+    """
+    Map a CSV row to StudentCreateSchema input. Guardians come either from a
+    JSON `guardians` column or from the flat guardian_* columns (one guardian).
+    """
+    data = {key: value for key, value in row.items() if key and value not in (None, "")}
+
+    if "guardians" in data:
+        data["guardians"] = json.loads(data["guardians"])
+    else:
+        guardian = {field: data.pop(column) for column, field in GUARDIAN_COLUMNS.items() if column in data}
+        data["guardians"] = [guardian] if guardian else []
+
+    if "status" in data:
+        data["status"] = data["status"].strip().lower() in ("true", "1", "yes")
+    return data
+
+def _decoded_lines(file: BinaryIO) -> Iterator[str]:
+    # Decode line by line so a bad byte is reported with its offset in the upload
+    offset = 0
+    for line_number, line in enumerate(file, start=1):
+        try:
+            text = line.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"File is not valid UTF-8 at byte {offset + e.start} (line {line_number})")
+        yield text.lstrip("\ufeff") if offset == 0 else text
+        offset += len(line)
+
+def _iter_import_rows(file: BinaryIO, file_format: str) -> Iterator[Tuple[int, Any]]:
+    lines = _decoded_lines(file)
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        row_number = 1
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                raise HTTPException(status_code=400, detail=f"Malformed CSV at row {row_number}: {e}")
+            yield row_number, row
+            row_number += 1
+    else:
+        for row_number, line in enumerate(lines, start=1):
+            if line.strip():
+                yield row_number, line
+
+def _parse_import_row(raw: Any, file_format: str) -> StudentCreateSchema:
+    data = _csv_row_to_student(raw) if file_format == "csv" else json.loads(raw)
+    return StudentCreateSchema(**data)
+
+def _import_error_messages(error: Exception) -> List[str]:
+    if isinstance(error, ValidationError):
+        return [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()]
+    return [str(error)]
+
+async def _import_chunk(chunk: List[Tuple[int, StudentCreateSchema]], report: StudentImportResultSchema):
+    # One $in query per chunk for index numbers that already exist
+    index_numbers = [student.index_number for _, student in chunk]
+    existing = {
+        doc["index_number"]
+        for doc in await students.find({"index_number": {"$in": index_numbers}}, {"index_number": 1}).to_list(None)
+    }
+
+    rows, documents = [], []
+    created_at = datetime.utcnow()
+    for row_number, student in chunk:
+        if student.index_number in existing:
+            report.errors.append(StudentImportRowErrorSchema(row=row_number, index_number=student.index_number, errors=["Index number already exists."]))
+            continue
+
+        student_data = student.dict()
+        if isinstance(student_data["dob"], date):
+            student_data["dob"] = datetime.combine(student_data["dob"], datetime.min.time())
+        student_data["created_at"] = created_at
+        student_data["deleted_at"] = None  # Soft delete handling
+
+        rows.append((row_number, student.index_number))
+        documents.append(student_data)
+
+    if not documents:
+        return
+
+    try:
+        result = await students.insert_many(documents, ordered=False)
+        report.created += len(result.inserted_ids)
+    except BulkWriteError as e:
+        report.created += e.details.get("nInserted", 0)
+        for err in e.details.get("writeErrors", []):
+            row_number, index_number = rows[err["index"]]
+            message = "Index number already exists." if err.get("code") == 11000 else err.get("errmsg", "Write failed")
+            report.errors.append(StudentImportRowErrorSchema(row=row_number, index_number=index_number, errors=[message]))
+
+def _read_import_rows(file: BinaryIO, file_format: str, report: StudentImportResultSchema) -> List[Tuple[int, StudentCreateSchema]]:
+    """
+    Decode and validate the whole upload before anything is written, so an
+    undecodable file or malformed CSV is rejected with nothing imported.
+    Runs in a worker thread, keeping the parsing off the event loop.
+    """
+    valid: List[Tuple[int, StudentCreateSchema]] = []
+    seen_index_numbers = set()
+    for row_number, raw in _iter_import_rows(file, file_format):
+        report.total_rows += 1
+        try:
+            student = _parse_import_row(raw, file_format)
+        except (ValidationError, ValueError, TypeError, RecursionError) as e:
+            report.errors.append(StudentImportRowErrorSchema(row=row_number, errors=_import_error_messages(e)))
+            continue
+
+        if student.index_number in seen_index_numbers:
+            report.errors.append(StudentImportRowErrorSchema(row=row_number, index_number=student.index_number, errors=["Duplicate index number in file."]))
+            continue
+        seen_index_numbers.add(student.index_number)
+        valid.append((row_number, student))
+    return valid
+
+# Import students from a CSV or NDJSON upload, validated up front and written in chunks
+async def import_students(file: BinaryIO, file_format: str) -> StudentImportResultSchema:
+    report = StudentImportResultSchema(total_rows=0, created=0, failed=0, errors=[])
+    valid = await asyncio.to_thread(_read_import_rows, file, file_format, report)
+
+    for start in range(0, len(valid), STUDENT_IMPORT_CHUNK_SIZE):
+        await _import_chunk(valid[start:start + STUDENT_IMPORT_CHUNK_SIZE], report)
+
+    report.failed = len(report.errors)
+    report.errors.sort(key=lambda error: error.row)
+    return report
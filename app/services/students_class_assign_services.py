@@ -2,11 +2,15 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from pymongo.collection import Collection
 from bson import ObjectId, errors
-from typing import List, Union
+from typing import List, Optional, Union
 from pymongo import UpdateOne
 from datetime import datetime
 from app.database.database import students, student_class_assignments
 from app.schemas.student_schema import StudentResponseSchema
+from app.services.attendance_roll_services import roll_sheet_cache
+from app.models.api_response import CursorPage
+from app.utils.pagination import DEFAULT_PAGE_LIMIT, after_cursor, split_page
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 from app.schemas.student_class_assign_schema import (
     StudentClassAssignmentCreateSchema, 
     StudentClassAssignmentResponseSchema, 
@@ -64,13 +68,22 @@ def assign_students_to_class(
         ]
 
         # Insert assignments into the collection
+        assigned_count = len(assignments)
         if assignments:
-            student_class_assignments.insert_many(assignments)
+            try:
+                student_class_assignments.insert_many(assignments, ordered=False)
+            except BulkWriteError as e:
+                # Students assigned concurrently (e.g. by a promotion) hit the unique index
+                write_errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != 11000 for err in write_errors):
+                    raise
+                assigned_count -= len(write_errors)
+            roll_sheet_cache.clear()
 
         return {
-            "message": f"{len(assignments)} students assigned successfully",
-            "assigned_count": len(assignments),  # Add assigned_count to the response
-            "skipped": len(student_ids) - len(assignments)
+            "message": f"{assigned_count} students assigned successfully",
+            "assigned_count": assigned_count,  # Add assigned_count to the response
+            "skipped": len(student_ids) - assigned_count
         }
     except HTTPException as e:
         raise e
@@ -78,35 +91,57 @@ def assign_students_to_class(
         raise HTTPException(status_code=500, detail=str(e))
     
 # List Unassigned Students
-def list_unassigned_students() -> List[UnassignedStudentResponseSchema]:
+def list_unassigned_students(
+    academic_year: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_LIMIT
+) -> CursorPage:
     """
-    List students who are not assigned to any class or grade.
+    Page of active students with no class assignment (for `academic_year`,
+    when given). The anti-join runs server-side in _id order and stops once
+    the page is full, so memory does not grow with enrollment.
     """
-    try:
-        # Fetch all active students
-        active_students = list(students.find({"status": True, "deleted_at": None}))
-
-        # Fetch all assigned student IDs
-        assigned_student_ids = set(student_class_assignments.distinct("student_id"))
+    assignment_match = {"deleted_at": None}
+    if academic_year is not None:
+        assignment_match["academic_year"] = academic_year
+
+    pipeline = [
+        {"$match": after_cursor({"status": True, "deleted_at": None}, cursor)},
+        {"$sort": {"_id": 1}},
+        {"$project": {"name": 1, "index_number": 1}},
+        {"$lookup": {
+            "from": student_class_assignments.name,
+            "localField": "_id",
+            "foreignField": "student_id",
+            "pipeline": [
+                {"$match": assignment_match},
+                {"$project": {"_id": 1}},
+                {"$limit": 1},
+            ],
+            "as": "assignment",
+        }},
+        {"$match": {"assignment": {"$size": 0}}},
+        {"$limit": limit + 1},
+    ]
 
-        # Filter out unassigned students
-        unassigned_students = [
-            student for student in active_students 
-            if student["_id"] not in assigned_student_ids
-        ]
+    try:
+        student_list, next_cursor = split_page(list(students.aggregate(pipeline)), limit)
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Convert to response schema
-        return [
+    return CursorPage(
+        items=[
             UnassignedStudentResponseSchema(
                 id=str(student["_id"]),
                 name=student["name"],
                 index_number=student["index_number"]
             )
-            for student in unassigned_students
-        ]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
+            for student in student_list
+        ],
+        limit=limit,
+        next_cursor=next_cursor
+    )
+
 # Update Student Assignment
 def update_student_assignment(
     assignment_id: str, 
@@ -126,13 +161,17 @@ def update_student_assignment(
         update_fields = {k: v for k, v in update_data.dict().items() if v is not None}
         update_fields["updated_at"] = datetime.utcnow()
 
-        # Update the assignment
-        result = student_class_assignments.update_one(
-            {"_id": assignment_id},
-            {"$set": update_fields}
-        )
+        # Update the assignment; moving it to a year the student already has hits the unique index
+        try:
+            result = student_class_assignments.update_one(
+                {"_id": assignment_id},
+                {"$set": update_fields}
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Student is already assigned to a class for that academic year")
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Assignment not found")
+        roll_sheet_cache.clear()
 
         # Fetch the updated assignment
         updated_assignment = student_class_assignments.find_one({"_id": assignment_id})
@@ -160,6 +199,7 @@ def remove_student_assignment(student_id: str) -> dict:
         result = student_class_assignments.delete_one({"student_id": student_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Student assignment not found")
+        roll_sheet_cache.clear()
 
         return {"message": "Student assignment removed successfully"}
     except HTTPException as e:
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from app.database.database import async_job_locks
+from app.config.config import JOB_LOCK_TTL_SECONDS
+
+# Identifies this worker process as a lease holder
+OWNER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+async def acquire_lease(name: str, ttl_seconds: int = JOB_LOCK_TTL_SECONDS) -> bool:
+    now = datetime.utcnow()
+    try:
+        # Matches only a free/expired lease or one we already hold; otherwise
+        # the upsert collides on `_id` and somebody else is the leader
+        await async_job_locks.find_one_and_update(
+            {"_id": name, "$or": [{"expires_at": {"$lte": now}}, {"owner": OWNER_ID}]},
+            {"$set": {"owner": OWNER_ID, "acquired_at": now, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def renew_lease(name: str, ttl_seconds: int = JOB_LOCK_TTL_SECONDS) -> bool:
+    result = await async_job_locks.update_one(
+        {"_id": name, "owner": OWNER_ID},
+        {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds)}}
+    )
+    return result.matched_count == 1
+
+async def release_lease(name: str):
+    await async_job_locks.delete_one({"_id": name, "owner": OWNER_ID})
+
+async def _keep_alive(name: str, ttl_seconds: int):
+    while True:
+        await asyncio.sleep(ttl_seconds / 3)
+        if not await renew_lease(name, ttl_seconds):
+            print(f"❌ Lost lease for job '{name}'")
+            return
+
+@asynccontextmanager
+async def job_lease(name: str, ttl_seconds: int = JOB_LOCK_TTL_SECONDS):
+    """
+    Holds the named lease for the duration of the block, renewing it in the
+    background. Yields False without waiting if another worker holds it.
+    """
+    if not await acquire_lease(name, ttl_seconds):
+        yield False
+        return
+
+    keep_alive = asyncio.create_task(_keep_alive(name, ttl_seconds))
+    try:
+        yield True
+    finally:
+        keep_alive.cancel()
+        await release_lease(name)
@@ -1,9 +1,101 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.database.database import async_job_runs
 from app.services.attendance_services import mark_absent_students
+from app.sheduler.job_lease import OWNER_ID, job_lease
+from app.config.config import ABSENT_JOB_HOUR, ABSENT_JOB_MINUTE, ABSENT_CATCHUP_DAYS
 
-scheduler = BackgroundScheduler()
+MARK_ABSENT_JOB = "mark_absent"
 
-# Schedule task every day at 11:59 PM
-scheduler.add_job(mark_absent_students, "cron", hour=23, minute=59)
+scheduler = AsyncIOScheduler()
 
-scheduler.start()
\ No newline at end of file
+# Run one day's absentee marking and record it in `job_runs`
+async def _run_for_day(scan_date: date, trigger: str) -> dict:
+    run = {
+        "job": MARK_ABSENT_JOB,
+        "scan_date": str(scan_date),
+        "trigger": trigger,
+        "owner": OWNER_ID,
+        "status": "running",
+        "started_at": datetime.utcnow(),
+        "finished_at": None,
+        "rows_written": None,
+        "result": None,
+        "error": None
+    }
+    run_id = (await async_job_runs.insert_one(run)).inserted_id
+
+    try:
+        result = await asyncio.to_thread(mark_absent_students, scan_date)
+        update = {"status": "succeeded", "rows_written": result["absent_marked"], "result": result}
+        print(f"✅ {MARK_ABSENT_JOB} {scan_date}: {result['absent_marked']} absent marked")
+    except Exception as e:
+        update = {"status": "failed", "error": str(e)}
+        print(f"❌ {MARK_ABSENT_JOB} {scan_date} failed: {e}")
+
+    update["finished_at"] = datetime.utcnow()
+    await async_job_runs.update_one({"_id": run_id}, {"$set": update})
+    return {**run, **update, "_id": run_id}
+
+# Days in the catch-up window that never had a successful run
+async def pending_days(today: date, include_today: bool) -> List[date]:
+    first_success = await async_job_runs.find_one(
+        {"job": MARK_ABSENT_JOB, "status": "succeeded"},
+        {"scan_date": 1},
+        sort=[("scan_date", 1)]
+    )
+    # Nothing to catch up on before the job has ever completed
+    if not first_success:
+        return [today] if include_today else []
+
+    window_start = max(
+        today - timedelta(days=ABSENT_CATCHUP_DAYS),
+        date.fromisoformat(first_success["scan_date"]) + timedelta(days=1)
+    )
+    window_end = today if include_today else today - timedelta(days=1)
+    if window_start > window_end:
+        return []
+
+    done = set(await async_job_runs.distinct("scan_date", {
+        "job": MARK_ABSENT_JOB,
+        "status": "succeeded",
+        "scan_date": {"$gte": str(window_start), "$lte": str(window_end)}
+    }))
+    days = []
+    day = window_start
+    while day <= window_end:
+        if str(day) not in done:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+# Nightly run: catch up on missed days, then today
+async def run_mark_absent_job(include_today: bool = True):
+    async with job_lease(MARK_ABSENT_JOB) as acquired:
+        if not acquired:
+            return
+        today = date.today()
+        for day in await pending_days(today, include_today):
+            await _run_for_day(day, "scheduled" if day == today else "catch_up")
+
+# On-demand run for one day, regardless of earlier runs
+async def run_mark_absent_for_day(scan_date: Optional[date] = None) -> Optional[dict]:
+    async with job_lease(MARK_ABSENT_JOB) as acquired:
+        if not acquired:
+            print(f"❌ {MARK_ABSENT_JOB} is already running on another worker")
+            return None
+        return await _run_for_day(scan_date or date.today(), "manual")
+
+def start_scheduler():
+    scheduler.add_job(run_mark_absent_job, "cron", hour=ABSENT_JOB_HOUR, minute=ABSENT_JOB_MINUTE,
+                      id=MARK_ABSENT_JOB, coalesce=True, misfire_grace_time=3600, replace_existing=True)
+    # Catch up on days missed while no worker was running
+    scheduler.add_job(run_mark_absent_job, kwargs={"include_today": False},
+                      id=f"{MARK_ABSENT_JOB}_catch_up", replace_existing=True)
+    scheduler.start()
+
+def shutdown_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
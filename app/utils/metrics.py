@@ -0,0 +1,283 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from pymongo import monitoring
+
+# Histogram buckets, in the Prometheus `le` sense
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # Per label set: non-cumulative bucket counts (+Inf last), sum, count
+        self._values: Dict[Labels, List] = {}
+
+    def observe(self, value: float, labels: Labels = ()):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        entry[0][index] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics rendered in the Prometheus text format. Updates
+    come from the event loop and from driver threads, so they share a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.request_duration = Histogram("http_request_duration_seconds", "Request latency by route template.", LATENCY_BUCKETS)
+        self.requests = Counter("http_requests_total", "Requests by route template and status code.")
+        self.request_mongo_commands = Histogram("http_request_mongo_commands", "MongoDB commands issued per request.", QUERY_COUNT_BUCKETS)
+        self.request_mongo_seconds = Histogram("http_request_mongo_seconds", "Time spent in MongoDB per request.", LATENCY_BUCKETS)
+        self.query_limit_exceeded = Counter("http_requests_query_limit_exceeded_total", "Requests that issued more MongoDB commands than the configured limit.")
+        self.mongo_commands = Counter("mongo_commands_total", "MongoDB commands by command name, including background work.")
+        self.mongo_command_failures = Counter("mongo_command_failures_total", "Failed MongoDB commands by command name.")
+        # Only changed from the event loop
+        self.in_flight = 0
+
+    def observe_request(self, method: str, route: str, status_code: int, duration: float, stats: "RequestStats", over_limit: bool):
+        labels = (("method", method), ("route", route))
+        with self.lock:
+            self.request_duration.observe(duration, labels)
+            self.requests.inc(labels + (("status", str(status_code)),))
+            self.request_mongo_commands.observe(stats.commands, labels)
+            self.request_mongo_seconds.observe(stats.mongo_seconds, labels)
+            if over_limit:
+                self.query_limit_exceeded.inc(labels)
+
+    def render(self) -> str:
+        metrics = (self.request_duration, self.requests, self.request_mongo_commands, self.request_mongo_seconds,
+                   self.query_limit_exceeded, self.mongo_commands, self.mongo_command_failures)
+        with self.lock:
+            lines = [line for metric in metrics for line in metric.render()]
+        lines += ["# HELP http_requests_in_flight Requests currently being handled.", "# TYPE http_requests_in_flight gauge", f"http_requests_in_flight {self.in_flight}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class RequestStats:
+    """
+    Mongo work done on behalf of one request. The object is shared through a
+    context variable, so Motor's executor threads update the same instance.
+    """
+
+    __slots__ = ("commands", "mongo_seconds", "_lock")
+
+    def __init__(self):
+        self.commands = 0
+        self.mongo_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_command(self):
+        with self._lock:
+            self.commands += 1
+
+    def add_duration(self, seconds: float):
+        with self._lock:
+            self.mongo_seconds += seconds
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent):
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.add_command()
+        with metrics.lock:
+            metrics.mongo_commands.inc((("command", event.command_name),))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.add_duration(event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.add_duration(event.duration_micros / 1_000_000)
+        with metrics.lock:
+            metrics.mongo_command_failures.inc((("command", event.command_name),))
+
+
+mongo_command_listener = MongoCommandListener()
+
+
+class PoolStats:
+    """
+    Checkout waits and open connections of one client's connection pool,
+    fed by `MongoPoolListener` from driver threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_open = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def checkout_started(self):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def checkout_finished(self, duration: Optional[float], failed: bool):
+        with self._lock:
+            self.waiting -= 1
+            if failed:
+                self.checkout_failures += 1
+            else:
+                self.checkouts += 1
+            if duration is not None:
+                self.wait_seconds_total += duration
+                self.wait_seconds_max = max(self.wait_seconds_max, duration)
+
+    def connection_opened(self, delta: int):
+        with self._lock:
+            self.connections_open += delta
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            finished = self.checkouts + self.checkout_failures
+            return {
+                "connections_open": self.connections_open,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "wait_ms_mean": round(self.wait_seconds_total / finished * 1000, 3) if finished else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self.stats = PoolStats()
+
+    def connection_check_out_started(self, event):
+        self.stats.checkout_started()
+
+    def connection_checked_out(self, event):
+        self.stats.checkout_finished(getattr(event, "duration", None), failed=False)
+
+    def connection_check_out_failed(self, event):
+        self.stats.checkout_finished(getattr(event, "duration", None), failed=True)
+
+    def connection_created(self, event):
+        self.stats.connection_opened(1)
+
+    def connection_closed(self, event):
+        self.stats.connection_opened(-1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+# One listener per client, so the sync and Motor pools are reported apart
+sync_pool_listener = MongoPoolListener()
+async_pool_listener = MongoPoolListener()
+
+
+class EventLoopLagMonitor:
+    """
+    Samples how late the event loop wakes up from a short sleep. Sustained
+    lag means something is blocking the loop.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 120):
+        self.interval = interval
+        self.samples: "deque[float]" = deque(maxlen=window)
+
+    async def run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def snapshot(self) -> Dict[str, float]:
+        samples = list(self.samples)
+        return {
+            "last_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+            "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+            "window_seconds": round(len(samples) * self.interval, 1),
+        }
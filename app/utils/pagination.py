@@ -0,0 +1,59 @@
+import base64
+from typing import Any, Dict, List, Optional, Tuple, Type
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+
+# Opaque keyset cursor: the url-safe base64 of the last returned _id
+def encode_cursor(last_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(last_id.binary).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return ObjectId(base64.urlsafe_b64decode(padded.encode()))
+    except (InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Add the keyset condition for the page after `cursor`
+def after_cursor(query: dict, cursor: Optional[str]) -> dict:
+    if not cursor:
+        return query
+    return {**query, "_id": {"$gt": decode_cursor(cursor)}}
+
+# Turn `fields=name,index_number` into a Mongo projection, checked against the schema
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    if not fields:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip() and field.strip() != "id"]
+    unknown = [field for field in requested if field not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    return requested
+
+def projection_for(fields: Optional[List[str]]) -> Optional[Dict[str, int]]:
+    if fields is None:
+        return None
+    return {field: 1 for field in fields}
+
+# Projected document as returned to the client, `id` is always included
+def project_document(document: dict, fields: List[str]) -> Dict[str, Any]:
+    projected = {"id": str(document["_id"])}
+    for field in fields:
+        value = document.get(field)
+        projected[field] = str(value) if isinstance(value, ObjectId) else value
+    return projected
+
+# Split the `limit + 1` documents fetched for a page into the page and the next cursor
+def split_page(documents: list, limit: int) -> Tuple[list, Optional[str]]:
+    if len(documents) <= limit:
+        return documents, None
+    documents = documents[:limit]
+    return documents, encode_cursor(documents[-1]["_id"])
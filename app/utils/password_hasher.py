@@ -0,0 +1,71 @@
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from app.utils.security import pwd_context
+from app.config.config import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+    LOGIN_MAX_CONCURRENT_PER_IP,
+    LOGIN_MAX_CONCURRENT_PER_EMAIL,
+)
+
+# bcrypt releases the GIL, so a few threads hash in parallel without
+# blocking the event loop
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+# Caps hashes waiting for or running on the pool, extra callers wait briefly then get a 503
+_pending = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight operations per key (client IP, email). Only used from
+    the event loop, so a plain dict of counters is enough.
+    """
+
+    def __init__(self, limit: int, detail: str):
+        self.limit = limit
+        self.detail = detail
+        self._active = defaultdict(int)
+
+    @contextmanager
+    def hold(self, key: str):
+        if self._active[key] >= self.limit:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=self.detail)
+        self._active[key] += 1
+        try:
+            yield
+        finally:
+            self._active[key] -= 1
+            if self._active[key] <= 0:
+                del self._active[key]
+
+
+ip_limiter = ConcurrencyLimiter(LOGIN_MAX_CONCURRENT_PER_IP, "Too many concurrent login attempts from this address")
+email_limiter = ConcurrencyLimiter(LOGIN_MAX_CONCURRENT_PER_EMAIL, "Too many concurrent login attempts for this account")
+
+
+async def _run_in_pool(fn, *args):
+    try:
+        await asyncio.wait_for(_pending.acquire(), timeout=PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Server busy, please retry")
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending.release()
+
+
+# Hash a password on the pool
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(pwd_context.hash, password)
+
+# Verify a password on the pool; returns a new hash when the stored one
+# uses a different bcrypt cost than BCRYPT_ROUNDS
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await _run_in_pool(pwd_context.verify_and_update, plain_password, hashed_password)
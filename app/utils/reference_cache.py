@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from app.database.database import grades, classes, async_db, async_grades, async_classes
+from app.config.config import REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_MAX_ENTRIES
+
+# Ids that were not found are remembered only briefly, so a grade/class
+# created on another worker is picked up quickly even without change streams
+NEGATIVE_TTL_SECONDS = 10
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU map whose entries also expire after a TTL.
+    Used from async routes and from sync services running in the threadpool.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default: Any = _MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl_seconds: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]):
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class ReferenceCache:
+    """
+    Cache of live (not soft-deleted) grade and class documents, plus the
+    class list of each grade. Writers in grade_services and class_services
+    invalidate entries explicitly; `watch_changes` keeps other workers in
+    sync through a Mongo change stream when enabled.
+    """
+
+    def __init__(self, max_entries: int = REFERENCE_CACHE_MAX_ENTRIES, ttl_seconds: float = REFERENCE_CACHE_TTL_SECONDS):
+        self.grades = TTLCache(max_entries, ttl_seconds)
+        self.classes = TTLCache(max_entries, ttl_seconds)
+        self.classes_by_grade = TTLCache(max_entries, ttl_seconds)
+        self.warmed = False
+
+    def _store(self, cache: TTLCache, key: str, document: Optional[dict]):
+        cache.set(key, document, None if document is not None else NEGATIVE_TTL_SECONDS)
+
+    # Sync lookups, for services running in the threadpool
+    def _get(self, cache: TTLCache, collection, document_id: str) -> Optional[dict]:
+        cached = cache.get(document_id)
+        if cached is not _MISSING:
+            return cached
+        if not ObjectId.is_valid(document_id):
+            return None
+        document = collection.find_one({"_id": ObjectId(document_id), "deleted_at": None})
+        self._store(cache, document_id, document)
+        return document
+
+    def get_grade(self, grade_id: str) -> Optional[dict]:
+        return self._get(self.grades, grades, grade_id)
+
+    def get_class(self, class_id: str) -> Optional[dict]:
+        return self._get(self.classes, classes, class_id)
+
+    def get_classes_by_grade(self, grade_id: str) -> List[dict]:
+        cached = self.classes_by_grade.get(grade_id)
+        if cached is not _MISSING:
+            return cached
+        class_list = list(classes.find({"grade_id": ObjectId(grade_id), "deleted_at": None}).sort("_id", 1))
+        self.classes_by_grade.set(grade_id, class_list)
+        return class_list
+
+    # Async lookups, for async routes
+    async def _get_async(self, cache: TTLCache, collection, document_id: str) -> Optional[dict]:
+        cached = cache.get(document_id)
+        if cached is not _MISSING:
+            return cached
+        if not ObjectId.is_valid(document_id):
+            return None
+        document = await collection.find_one({"_id": ObjectId(document_id), "deleted_at": None})
+        self._store(cache, document_id, document)
+        return document
+
+    async def get_grade_async(self, grade_id: str) -> Optional[dict]:
+        return await self._get_async(self.grades, async_grades, grade_id)
+
+    async def get_class_async(self, class_id: str) -> Optional[dict]:
+        return await self._get_async(self.classes, async_classes, class_id)
+
+    async def has_grade(self, grade_id: str) -> bool:
+        return await self.get_grade_async(grade_id) is not None
+
+    async def has_class(self, class_id: str) -> bool:
+        return await self.get_class_async(class_id) is not None
+
+    # Preload every live grade and class so the first scans after a restart hit
+    async def warm(self):
+        grade_list = await async_grades.find({"deleted_at": None}).to_list(None)
+        class_list = await async_classes.find({"deleted_at": None}).sort("_id", 1).to_list(None)
+
+        classes_of_grade: Dict[str, List[dict]] = {str(grade["_id"]): [] for grade in grade_list}
+        for grade in grade_list:
+            self._store(self.grades, str(grade["_id"]), grade)
+        for class_doc in class_list:
+            self._store(self.classes, str(class_doc["_id"]), class_doc)
+            classes_of_grade.setdefault(str(class_doc["grade_id"]), []).append(class_doc)
+        for grade_id, class_docs in classes_of_grade.items():
+            self.classes_by_grade.set(grade_id, class_docs)
+
+        self.warmed = True
+
+    # Invalidation
+    def invalidate_grade(self, grade_id: str):
+        self.grades.invalidate(str(grade_id))
+        self.classes_by_grade.invalidate(str(grade_id))
+
+    def invalidate_class(self, class_id: str):
+        self.classes.invalidate(str(class_id))
+        # A class can move between grades on update, so drop every grade list
+        self.classes_by_grade.clear()
+
+    def clear(self):
+        self.grades.clear()
+        self.classes.clear()
+        self.classes_by_grade.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "grades": self.grades.stats(),
+            "classes": self.classes.stats(),
+            "classes_by_grade": self.classes_by_grade.stats(),
+        }
+
+    async def watch_changes(self):
+        """
+        Invalidate entries changed by any worker. Needs a replica set or
+        Atlas; on a standalone server the watcher stops and TTL expiry
+        remains the only cross-worker invalidation.
+        """
+        pipeline = [{"$match": {"ns.coll": {"$in": [grades.name, classes.name]}}}]
+        try:
+            async with async_db.watch(pipeline) as stream:
+                async for change in stream:
+                    document_id = str(change["documentKey"]["_id"])
+                    if change["ns"]["coll"] == grades.name:
+                        self.invalidate_grade(document_id)
+                    else:
+                        self.invalidate_class(document_id)
+        except PyMongoError as e:
+            print(f"❌ Reference cache change stream stopped: {e}")
+
+
+reference_cache = ReferenceCache()
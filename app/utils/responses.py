@@ -0,0 +1,33 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _orjson_default(value: Any) -> Any:
+    # One model_dump per page: nested models come back as plain dicts
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ApiORJSONResponse(ORJSONResponse):
+    """
+    orjson response that also understands pydantic models and ObjectIds, so
+    service results can be written out without another validation pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+# ApiResponse envelope written straight to JSON. Returning a Response makes
+# FastAPI skip response_model validation, which then only documents the shape
+def api_response(data: Any, message: str, status: bool = True, status_code: int = 200) -> ApiORJSONResponse:
+    return ApiORJSONResponse({"status": status, "message": message, "data": data}, status_code=status_code)
@@ -1,11 +1,19 @@
+import hashlib
+import hmac
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from app.config.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.config.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, BCRYPT_ROUNDS, QR_SIGNATURE_VERSION
 import pytz
 
-# Password hashing and verification
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing and verification, hashes with another cost are flagged for rehash
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=BCRYPT_ROUNDS,
+)
 
 # password hash
 def hash_password(password: str) -> str:
@@ -36,6 +44,33 @@ def verify_token(token: str):
         return payload if payload["exp"] >= datetime.utcnow().timestamp() else None
     except JWTError:
         return None
+
+# QR payload signing, the key version is part of the signed message
+_QR_DIGEST_LENGTH = hashlib.sha256().digest_size * 2
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+def _qr_digest(version: int, student_id: str, grade_id: str, class_id: str) -> str:
+    message = f"{version}:{student_id}:{grade_id}:{class_id}".encode()
+    return hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+def sign_qr_payload(student_id: str, grade_id: str, class_id: str) -> str:
+    return f"v{QR_SIGNATURE_VERSION}.{_qr_digest(QR_SIGNATURE_VERSION, student_id, grade_id, class_id)}"
+
+def verify_qr_signature(student_id: str, grade_id: str, class_id: str, signature: str) -> bool:
+    """
+    Check a QR signature so the scan path can trust the student id without a
+    lookup. Signatures don't expire and aren't tied to the student's status:
+    a student deleted after printing still verifies until QR_SIGNATURE_VERSION
+    is bumped, which revokes every code signed with the older version.
+    """
+    if not signature:
+        return False
+    version, _, digest = signature.partition(".")
+    # Only fixed-length lowercase hex reaches compare_digest, which rejects non-ASCII str
+    if version != f"v{QR_SIGNATURE_VERSION}" or len(digest) != _QR_DIGEST_LENGTH or not _HEX_DIGITS.issuperset(digest):
+        return False
+    expected = _qr_digest(QR_SIGNATURE_VERSION, student_id, grade_id, class_id)
+    return hmac.compare_digest(expected.encode(), digest.encode())
     
     
 # monkey pacthing time zone
@@ -0,0 +1,9 @@
+import os
+
+# Point the app at a throwaway database before anything imports app.config
+os.environ.setdefault("DATABASE_NAME", "school_db_bench")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("REFERENCE_CACHE_CHANGE_STREAMS", "false")
+
+# Password shared by every seeded admin
+BENCH_PASSWORD = "bench-password"
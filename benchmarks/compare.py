@@ -0,0 +1,58 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json --threshold 10
+
+Exits 1 when any scenario's p95 latency grows, or its throughput drops, by
+more than `--threshold` percent.
+"""
+import argparse
+import json
+import sys
+
+METRICS = (("throughput_per_second", "throughput", False), ("p50_ms", "p50", True), ("p95_ms", "p95", True), ("p99_ms", "p99", True))
+
+
+def _change(base: float, head: float) -> float:
+    return (head - base) / base * 100 if base else 0.0
+
+
+def compare(base: dict, head: dict, threshold: float) -> list:
+    regressions = []
+    print(f"{'scenario':<30}" + "".join(f"{label:>29}" for _, label, _ in METRICS))
+    for name in sorted(set(base["scenarios"]) & set(head["scenarios"])):
+        row = f"{name:<30}"
+        for key, label, lower_is_better in METRICS:
+            before, after = base["scenarios"][name][key], head["scenarios"][name][key]
+            change = _change(before, after)
+            row += f"{before:>10.2f} → {after:>8.2f} {change:+5.1f}%"
+            regressed = change > threshold if lower_is_better else change < -threshold
+            if regressed and key in ("throughput_per_second", "p95_ms"):
+                regressions.append(f"{name} {label} {change:+.1f}%")
+        print(row)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base {base['meta']['commit']}  head {head['meta']['commit']}")
+    regressions = compare(base, head, args.threshold)
+    if regressions:
+        print("❌ Regressions: " + ", ".join(regressions))
+        return 1
+    print("✅ No regressions beyond threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
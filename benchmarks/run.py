@@ -0,0 +1,235 @@
+"""
+Drive the app in-process through httpx and record latency percentiles.
+
+    python -m benchmarks.run --requests 2000 --concurrency 50 --output benchmarks/results/head.json
+
+Expects a database prepared by `python -m benchmarks.seed`. Scenarios that
+write (attendance scans, absentee marking) clear their own rows first, so
+repeated runs against the same seed stay comparable. Like the seed script,
+it refuses a DATABASE_NAME not ending in `_bench` unless `--force` is given.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+import httpx
+from benchmarks import BENCH_PASSWORD
+from app.main import app
+from app.config.config import DATABASE_NAME
+from app.database.database import admins, students, student_class_assignments, attendance, attendance_daily_summaries
+from app.services.attendance_services import mark_absent_students
+from app.services.filters_services import get_all_students_with_class_details
+
+SCENARIOS = ("post_attendance", "get_students", "login", "filter_students", "students_with_class_details", "mark_absent", "attendance_analytics")
+
+# Absentee runs use dates far from real data so every run marks everyone
+MARK_ABSENT_BASE_DATE = date(2000, 1, 1)
+# Covers the history written by `benchmarks.seed --history-days`
+ANALYTICS_DAYS = 30
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "operations": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+async def drive(operation: Callable[[int], Awaitable[bool]], total: int, concurrency: int) -> dict:
+    """
+    Run `operation(i)` for i in range(total) with at most `concurrency` in
+    flight. The operation returns False for a failed call.
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            started = time.perf_counter()
+            ok = await operation(i)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/login", json={"email": email, "password": BENCH_PASSWORD})
+
+
+async def run_benchmarks(requests: int, concurrency: int, slow_iterations: int, scenarios: List[str]) -> Dict[str, dict]:
+    admin_emails = [admin["email"] for admin in admins.find({"deleted_at": None}, {"email": 1})]
+    assignments = list(student_class_assignments.find({}, {"student_id": 1, "grade_id": 1, "class_id": 1, "academic_year": 1}))
+    if not admin_emails or not assignments:
+        raise RuntimeError(f"{DATABASE_NAME} is empty; run `python -m benchmarks.seed` first")
+    class_keys = sorted({(str(a["grade_id"]), str(a["class_id"]), a["academic_year"]) for a in assignments})
+
+    results: Dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+
+    # ASGITransport does not run the lifespan, so enter it here
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await _login(client, admin_emails[0])
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['data']['access_token']}"
+
+            if "post_attendance" in scenarios:
+                scan_date = str(date.today())
+                attendance.delete_many({"scan_date": scan_date})
+                attendance_daily_summaries.delete_many({"scan_date": scan_date})
+                scans = assignments[:requests]
+
+                async def post_attendance(i: int) -> bool:
+                    scan = scans[i]
+                    response = await client.post("/attendance", json={
+                        "student_id": str(scan["student_id"]),
+                        "grade_id": str(scan["grade_id"]),
+                        "class_id": str(scan["class_id"]),
+                        "scan_date": scan_date
+                    })
+                    return response.status_code == 201
+
+                results["post_attendance"] = await drive(post_attendance, len(scans), concurrency)
+
+            if "get_students" in scenarios:
+                async def get_students(i: int) -> bool:
+                    response = await client.get("/students", params={"limit": 50})
+                    return response.status_code == 200
+
+                results["get_students"] = await drive(get_students, requests, concurrency)
+
+            if "login" in scenarios:
+                # Logins are bounded per email, so spread them over all admins
+                async def login(i: int) -> bool:
+                    response = await _login(client, admin_emails[i % len(admin_emails)])
+                    return response.status_code == 200
+
+                login_total = max(1, requests // 10)
+                results["login"] = await drive(login, login_total, min(concurrency, 2 * len(admin_emails)))
+
+            if "filter_students" in scenarios:
+                async def filter_students(i: int) -> bool:
+                    grade_id, class_id, academic_year = class_keys[i % len(class_keys)]
+                    response = await client.get("/students/filter", params={
+                        "grade_id": grade_id, "class_id": class_id, "academic_year": academic_year
+                    })
+                    return response.status_code == 200
+
+                results["filter_students"] = await drive(filter_students, requests, concurrency)
+
+            # End to end through the route: aggregation, numpy and serialization
+            if "attendance_analytics" in scenarios:
+                async def attendance_analytics(i: int) -> bool:
+                    response = await client.get("/analytics/attendance", params={
+                        "start_date": str(date.today() - timedelta(days=ANALYTICS_DAYS)),
+                        "end_date": str(date.today() - timedelta(days=1))
+                    })
+                    return response.status_code == 200 and response.json()["data"]["records"] > 0
+
+                results["attendance_analytics"] = await drive(attendance_analytics, slow_iterations, 1)
+
+        # Whole-school jobs run one at a time, as they do in production
+        if "students_with_class_details" in scenarios:
+            async def students_with_class_details(i: int) -> bool:
+                return bool(await asyncio.to_thread(get_all_students_with_class_details))
+
+            results["students_with_class_details"] = await drive(students_with_class_details, slow_iterations, 1)
+
+        if "mark_absent" in scenarios:
+            days = [str(MARK_ABSENT_BASE_DATE + timedelta(days=i)) for i in range(slow_iterations)]
+            attendance.delete_many({"scan_date": {"$in": days}})
+            attendance_daily_summaries.delete_many({"scan_date": {"$in": days}})
+
+            async def mark_absent(i: int) -> bool:
+                result = await asyncio.to_thread(mark_absent_students, MARK_ABSENT_BASE_DATE + timedelta(days=i))
+                return result["absent_marked"] > 0
+
+            results["mark_absent"] = await drive(mark_absent, slow_iterations, 1)
+            attendance.delete_many({"scan_date": {"$in": days}})
+            attendance_daily_summaries.delete_many({"scan_date": {"$in": days}})
+
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark scenarios against the seeded database.")
+    parser.add_argument("--requests", type=int, default=1000, help="operations per HTTP scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--slow-iterations", type=int, default=3, help="runs of each whole-school job")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--force", action="store_true", help="allow a database name not ending in _bench")
+    args = parser.parse_args(argv)
+
+    # The scenarios delete attendance rows, so never run against a real database by accident
+    if not DATABASE_NAME.endswith("_bench") and not args.force:
+        print(f"❌ Refusing to run against '{DATABASE_NAME}': use a *_bench database or pass --force")
+        return 1
+
+    commit = _git_commit()
+    student_count = students.estimated_document_count()
+    results = asyncio.run(run_benchmarks(args.requests, args.concurrency, args.slow_iterations, args.scenarios))
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "database": DATABASE_NAME,
+            "students": student_count,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "slow_iterations": args.slow_iterations,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in results.items():
+        print(f"{name:<30} {stats['throughput_per_second']:>10.2f}/s  p50 {stats['p50_ms']:>9.2f}ms  p95 {stats['p95_ms']:>9.2f}ms  p99 {stats['p99_ms']:>9.2f}ms  errors {stats['errors']}")
+    print(f"✅ Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Seed a benchmark database with a synthetic school.
+
+    python -m benchmarks.seed --grades 13 --classes-per-grade 4 --students-per-class 40
+
+Drops and recreates every collection in DATABASE_NAME (default
+`school_db_bench`), which must end in `_bench` unless `--force` is given.
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+from benchmarks import BENCH_PASSWORD
+from app.config.config import DATABASE_NAME
+from app.database.database import db, admins, students, grades, classes, student_class_assignments, attendance
+from app.database.indexes import INDEXES, ensure_indexes
+from app.utils.security import hash_password
+
+INSERT_CHUNK_SIZE = 5000
+SECTIONS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _insert_chunked(collection, documents):
+    for start in range(0, len(documents), INSERT_CHUNK_SIZE):
+        collection.insert_many(documents[start:start + INSERT_CHUNK_SIZE], ordered=False)
+
+
+def seed(grade_count: int, classes_per_grade: int, students_per_class: int, admin_count: int, academic_year: int, history_days: int) -> dict:
+    started = time.perf_counter()
+    for name in set(INDEXES) | {"job_locks", "job_runs"}:
+        db.drop_collection(name)
+    ensure_indexes()
+
+    now = datetime.utcnow()
+    grade_docs = [
+        {"grade_level": level, "description": f"Grade {level}", "created_at": now, "updated_at": None, "deleted_at": None}
+        for level in range(1, grade_count + 1)
+    ]
+    grades.insert_many(grade_docs)
+
+    class_docs = [
+        {"grade_id": grade["_id"], "section_name": SECTIONS[section], "description": f"Class {SECTIONS[section]} for grade {grade['grade_level']}",
+         "created_at": now, "updated_at": None, "deleted_at": None}
+        for grade in grade_docs
+        for section in range(classes_per_grade)
+    ]
+    classes.insert_many(class_docs)
+
+    student_docs = []
+    assignment_docs = []
+    for class_doc in class_docs:
+        for _ in range(students_per_class):
+            number = len(student_docs) + 1
+            student_docs.append({
+                "image": None,
+                "name": f"Student {number}",
+                "dob": datetime(2010, 1, 1),
+                "address": f"{number} Main Street",
+                "city": "Colombo",
+                "index_number": f"B{number:07d}",
+                "nic": None,
+                "guardians": [{"name": f"Guardian {number}", "relationship": "Parent", "contact_number": "0771234567", "guardian_email": None}],
+                "status": True,
+                "join_year": academic_year,
+                "created_at": now,
+                "updated_at": None,
+                "deleted_at": None
+            })
+    _insert_chunked(students, student_docs)
+
+    for index, student in enumerate(student_docs):
+        class_doc = class_docs[index // students_per_class]
+        assignment_docs.append({
+            "student_id": student["_id"],
+            "grade_id": class_doc["grade_id"],
+            "class_id": class_doc["_id"],
+            "academic_year": academic_year,
+            "created_at": now,
+            "updated_at": None,
+            "deleted_at": None
+        })
+    _insert_chunked(student_class_assignments, assignment_docs)
+
+    # Attendance for the days before today, every tenth scan absent, so the
+    # analytics scenario has history to read
+    history_docs = [
+        {
+            "student_id": str(assignment["student_id"]),
+            "grade_id": str(assignment["grade_id"]),
+            "class_id": str(assignment["class_id"]),
+            "scan_date": str(date.today() - timedelta(days=day)),
+            "time": "07:15:00",
+            "status": "A" if (index + day) % 10 == 0 else "P",
+            "created_at": now,
+            "updated_at": None,
+            "deleted_at": None
+        }
+        for day in range(1, history_days + 1)
+        for index, assignment in enumerate(assignment_docs)
+    ]
+    _insert_chunked(attendance, history_docs)
+
+    # One password hash reused for every admin keeps seeding fast
+    password = hash_password(BENCH_PASSWORD)
+    admins.insert_many([
+        {"image": None, "name": f"Bench Admin {i}", "email": f"bench{i}@example.com", "password": password, "created_at": now, "deleted_at": None}
+        for i in range(admin_count)
+    ])
+
+    return {
+        "grades": len(grade_docs),
+        "classes": len(class_docs),
+        "students": len(student_docs),
+        "admins": admin_count,
+        "attendance": len(history_docs),
+        "academic_year": academic_year,
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Seed the benchmark database with a synthetic school.")
+    parser.add_argument("--grades", type=int, default=13)
+    parser.add_argument("--classes-per-grade", type=int, default=4)
+    parser.add_argument("--students-per-class", type=int, default=40)
+    parser.add_argument("--admins", type=int, default=8)
+    parser.add_argument("--academic-year", type=int, default=date.today().year)
+    parser.add_argument("--history-days", type=int, default=30, help="days of attendance before today")
+    parser.add_argument("--force", action="store_true", help="allow a database name not ending in _bench")
+    args = parser.parse_args(argv)
+
+    if not DATABASE_NAME.endswith("_bench") and not args.force:
+        print(f"❌ Refusing to drop '{DATABASE_NAME}': use a *_bench database or pass --force")
+        return 1
+
+    summary = seed(args.grades, args.classes_per_grade, args.students_per_class, args.admins, args.academic_year, args.history_days)
+    print(f"✅ Seeded {DATABASE_NAME}: {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())